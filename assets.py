@@ -0,0 +1,101 @@
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+from sprite import Sprite
+
+
+FRAME_DIRS = ('spaceFrames', 'trashFrames', 'otherFrames')
+BUNDLE_PATH = os.path.join('.assets_cache', 'frames.json')
+BUNDLE_VERSION = 3
+
+_sprites: Dict[str, Sprite] = dict()
+
+
+def _get_signature(paths: Iterable[str]) -> List[list]:
+    """Return files identity: path, modification time and size."""
+
+    signature = []
+    for path in paths:
+        stat = os.stat(path)
+        signature.append([path, stat.st_mtime_ns, stat.st_size])
+    return signature
+
+
+def parse_frame(path: str) -> Sprite:
+    with open(path, 'r') as f:
+        return Sprite('\n'.join(line.rstrip() for line in f))
+
+
+def _read_bundle(bundle_path: str, signature) -> Optional[Dict[str, Sprite]]:
+    # bundle is plain data, so it can't run code, any broken or stale one
+    # is just rebuilt
+    try:
+        with open(bundle_path, 'r') as f:
+            bundle = json.load(f)
+        if (bundle['version'] != BUNDLE_VERSION or
+                bundle['signature'] != signature):
+            return None
+        return {path: Sprite.from_data(data)
+                for path, data in bundle['sprites'].items()}
+    except (OSError, ValueError, TypeError, KeyError, AttributeError):
+        return None
+
+
+def _write_bundle(bundle_path: str, signature, sprites: Dict[str, Sprite]):
+    bundle = {
+        'version': BUNDLE_VERSION,
+        'signature': signature,
+        'sprites': {path: sprite.to_data()
+                    for path, sprite in sprites.items()},
+    }
+    temp_path = f'{bundle_path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(bundle_path) or '.', exist_ok=True)
+        with open(temp_path, 'w') as f:
+            json.dump(bundle, f)
+        os.replace(temp_path, bundle_path)
+    except OSError:
+        # cache is optional, game works with frames parsed from text files
+        pass
+
+
+def load_sprites(paths: Iterable[str],
+                 bundle_path=BUNDLE_PATH) -> Dict[str, Sprite]:
+    """
+    Load sprites of frame files from the bundle — single cached file with
+    all frames already compiled. Bundle is rebuilt if any frame file is
+    changed.
+    """
+
+    paths = tuple(sorted(set(paths)))
+    signature = _get_signature(paths)
+
+    sprites = _read_bundle(bundle_path, signature)
+    if sprites is None:
+        sprites = {path: parse_frame(path) for path in paths}
+        _write_bundle(bundle_path, signature, sprites)
+    return sprites
+
+
+def _list_frame_files(frame_dirs=FRAME_DIRS) -> List[str]:
+    paths = []
+    for frame_dir in frame_dirs:
+        for name in os.listdir(frame_dir):
+            if name.endswith('.txt'):
+                paths.append(f'{frame_dir}/{name}')
+    return paths
+
+
+def get_sprite(path: str) -> Sprite:
+    """
+    Return sprite of frame file. On the first call sprites of all frames
+    from FRAME_DIRS are loaded at once.
+    """
+
+    if path not in _sprites:
+        paths = _list_frame_files()
+        if path not in paths:
+            paths.append(path)
+        _sprites.update(load_sprites(paths))
+    return _sprites[path]
@@ -0,0 +1,69 @@
+import asyncio
+from typing import Coroutine, Dict, List, Optional, Set
+
+
+class TickClock:
+    """
+    Game ticks for coroutines run as asyncio tasks. Sleeping coroutine
+    waits for the future resolved at the tick it is due, so only
+    the coroutines due at the tick are woken up.
+    """
+
+    def __init__(self):
+        self.tick = 0
+        self._waiters: Dict[int, List[asyncio.Future]] = dict()
+
+    def next_frame(self, ticks=1) -> asyncio.Future:
+        """Return future resolved at the frame after ticks passed."""
+
+        future = asyncio.get_event_loop().create_future()
+        due_tick = self.tick + max(ticks, 1)
+        self._waiters.setdefault(due_tick, []).append(future)
+        return future
+
+    def start_tick(self):
+        """Wake up coroutines due at the current tick."""
+
+        for future in self._waiters.pop(self.tick, ()):
+            if not future.done():
+                future.set_result(None)
+
+    def end_tick(self):
+        self.tick += 1
+
+
+class TaskGroup:
+    """
+    Named set of tasks cancelled together, e.g. all tasks of the ship on
+    game over. Finished tasks are removed from the group, the first error
+    raised by a task is kept to be reraised by the game loop.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.error: Optional[BaseException] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def spawn(self, coroutine: Coroutine) -> asyncio.Task:
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._on_done)
+        return task
+
+    def _on_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if task.cancelled() or self.error is not None:
+            return
+        self.error = task.exception()
+
+    def cancel(self):
+        for task in self._tasks:
+            task.cancel()
+
+    async def wait(self):
+        """Wait until all tasks of the group are finished or cancelled."""
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
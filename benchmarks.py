@@ -0,0 +1,244 @@
+"""
+Benchmarks of the game subsystems: python3 benchmarks.py --output result.json
+
+Results of two runs are compared with:
+    python3 benchmarks.py --compare old.json new.json
+"""
+import argparse
+import json
+import random
+import subprocess
+import sys
+import time
+from array import array
+from itertools import cycle
+from typing import Callable, Dict, List
+
+from curses_tools import draw_frame
+from frame_buffer import FrameBuffer
+from game import MyGame
+from headless import HeadlessCanvas, run_headless
+from lifecycle import DEAD, Lifecycle
+from obstacles import Obstacle
+from physics import update_speed, update_speeds
+from space_garbage import get_trash_frames
+from spatial_grid import SpatialGrid
+from star_field import StarField
+
+
+SIZES = ((40, 120), (80, 300))
+OBSTACLE_COUNTS = (10, 100, 1000)
+DEFAULT_SEED = 1957
+REPEATS = 5
+
+
+def measure(function: Callable[[], None], number: int,
+            repeats=REPEATS) -> float:
+    """Return the best time of one call in microseconds."""
+
+    best = float('inf')
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, time.perf_counter() - start_time)
+    return best / number * 1e6
+
+
+class ImmortalLifecycle(Lifecycle):
+    """Ship never dies, so every run simulates the same number of ticks."""
+
+    def switch(self, state: str):
+        if state != DEAD:
+            super().switch(state)
+
+
+def bench_ticks(rows, columns, ticks, start_year, seed) -> dict:
+    random.seed(seed)
+    game = MyGame()
+    game.lifecycle = ImmortalLifecycle()
+    game.current_year = start_year
+    script = [[]] * ticks
+    result = run_headless(ticks, rows, columns, script, game=game)
+    return {
+        'ticks': result.ticks,
+        'ticks_per_second': round(result.ticks_per_second, 1),
+        'obstacles': len(result.game.obstacles),
+    }
+
+
+def bench_stars(rows, columns, seed) -> dict:
+    random.seed(seed)
+    game = MyGame()
+    game.viewport.resize(rows, columns)
+    star_field = StarField(game.generate_stars())
+    if not star_field:
+        raise RuntimeError(f'No stars generated for {rows}x{columns}.')
+    canvas = FrameBuffer(rows, columns)
+    ticks = iter(range(10 ** 9))
+    return {
+        'stars': len(star_field),
+        'tick_us': measure(lambda: star_field.draw(canvas, next(ticks)), 200),
+    }
+
+
+def bench_draw_frame(rows, columns) -> dict:
+    canvas = FrameBuffer(rows, columns)
+    frame = get_trash_frames()[1].frame
+
+    def draw_sprite():
+        draw_frame(canvas, 5, 5, frame)
+        draw_frame(canvas, 5, 5, frame, negative=True)
+
+    def draw_text():
+        draw_frame(canvas, 5, 5, frame.text)
+        draw_frame(canvas, 5, 5, frame.text, negative=True)
+
+    screen = HeadlessCanvas(rows, columns)
+    negative = cycle((False, True))
+
+    def flush():
+        draw_frame(canvas, 5, 5, frame, negative=next(negative))
+        canvas.flush(screen)
+
+    return {
+        'sprite_us': measure(draw_sprite, 1000),
+        'text_us': measure(draw_text, 1000),
+        'flush_us': measure(flush, 1000),
+    }
+
+
+def bench_collisions(rows, columns, obstacles_count, seed) -> dict:
+    random.seed(seed)
+    grid = SpatialGrid()
+    for uid in range(obstacles_count):
+        frame = random.choice(get_trash_frames())
+        row = random.uniform(0, rows)
+        grid[uid] = Obstacle(row, random.randint(0, columns), frame.height,
+                             frame.width, mask=frame.frame.mask)
+        # garbage is flying, so the swept check is not trivial
+        grid.move(uid, row + random.uniform(0.01, 1.01))
+
+    # bullets flying up, as the game checks them every tick
+    moves = [(random.uniform(0, rows), random.uniform(0, columns), -0.3, 0)
+             for _ in range(100)]
+
+    def scan():
+        return [
+            any(obstacle.has_swept_collision(row, column, row_move,
+                                             column_move)
+                for obstacle in grid.values())
+            for row, column, row_move, column_move in moves
+        ]
+
+    def query():
+        for row, column, row_move, column_move in moves:
+            grid.find_swept_collision(row, column, row_move, column_move)
+
+    found = [grid.find_swept_collision(*move) is not None for move in moves]
+    if found != scan():
+        raise RuntimeError('Grid and linear scan found different collisions.')
+
+    return {
+        'obstacles': obstacles_count,
+        'linear_scan_us': measure(scan, 1) / len(moves),
+        'grid_query_us': measure(query, 10) / len(moves),
+    }
+
+
+def bench_update_speed() -> dict:
+    directions = [(random.choice((-1, 0, 1)), random.choice((-1, 0, 1)))
+                  for _ in range(100)]
+
+    def update():
+        row_speed = column_speed = 0
+        for rows_direction, columns_direction in directions:
+            row_speed, column_speed = update_speed(
+                row_speed, column_speed, rows_direction, columns_direction)
+
+    bodies_count = 100
+    row_speeds = array('d', [0]) * bodies_count
+    column_speeds = array('d', [0]) * bodies_count
+    rows_directions = array('b', (random.choice((-1, 0, 1))
+                                  for _ in range(bodies_count)))
+    columns_directions = array('b', (random.choice((-1, 0, 1))
+                                     for _ in range(bodies_count)))
+
+    def update_batch():
+        update_speeds(row_speeds, column_speeds, rows_directions,
+                      columns_directions)
+
+    return {
+        'call_us': measure(update, 100) / len(directions),
+        'batch_body_us': measure(update_batch, 100) / bodies_count,
+    }
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', '--short', 'HEAD'), capture_output=True,
+            text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def run_benchmarks(ticks: int, seed: int) -> Dict[str, dict]:
+    results = {}
+    for rows, columns in SIZES:
+        size = f'{rows}x{columns}'
+        for start_year in (1961, 2020):
+            results[f'ticks/{size}/{start_year}'] = bench_ticks(
+                rows, columns, ticks, start_year, seed)
+        results[f'stars/{size}'] = bench_stars(rows, columns, seed)
+        results[f'draw_frame/{size}'] = bench_draw_frame(rows, columns)
+        for obstacles_count in OBSTACLE_COUNTS:
+            results[f'collisions/{size}/{obstacles_count}'] = (
+                bench_collisions(rows, columns, obstacles_count, seed))
+    random.seed(seed)
+    results['update_speed'] = bench_update_speed()
+    return results
+
+
+def compare(old: dict, new: dict) -> List[str]:
+    """Return lines with ratio new/old for every common measurement."""
+
+    lines = [f'{old["commit"] or "old"} -> {new["commit"] or "new"}']
+    for name, values in new['results'].items():
+        old_values = old['results'].get(name, {})
+        for key, value in values.items():
+            old_value = old_values.get(key)
+            if not old_value or not isinstance(value, float):
+                continue
+            lines.append(f'{name} {key}: {old_value:.2f} -> {value:.2f} '
+                         f'(x{value / old_value:.2f})')
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark game subsystems')
+    parser.add_argument('--ticks', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--output', type=argparse.FileType('w'),
+                        default=sys.stdout)
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+                        type=argparse.FileType('r'))
+    args = parser.parse_args()
+
+    if args.compare:
+        old, new = (json.load(f) for f in args.compare)
+        print('\n'.join(compare(old, new)))
+        return
+
+    report = {
+        'commit': get_commit(),
+        'python': sys.version.split()[0],
+        'seed': args.seed,
+        'results': run_benchmarks(args.ticks, args.seed),
+    }
+    json.dump(report, args.output, indent=2)
+    args.output.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+
+MAX_SKIPPED_RENDERS = 5
+
+
+class FixedStepClock:
+    """
+    Game loop with fixed simulation step. Time spent by the step is
+    subtracted from the sleep, so game speed does not depend on load.
+    When the loop is late, rendering is skipped — frame is dropped — to let
+    simulation catch up, but no more than max_skipped_renders in a row.
+    """
+
+    def __init__(self, step: float, max_skipped_renders=MAX_SKIPPED_RENDERS,
+                 time_func=time.perf_counter, sleep_func=time.sleep):
+        self.step = step
+        self.max_skipped_renders = max_skipped_renders
+        self.steps = 0
+        self.frames = 0
+        self.dropped_frames = 0
+
+        self._time = time_func
+        self._sleep = sleep_func
+        self._next_step_time = 0.0
+        self._skipped_renders = 0
+
+    def reset(self):
+        """Count next steps from now, e.g. after game was waiting for keys."""
+
+        self._next_step_time = self._time()
+        self._skipped_renders = 0
+
+    def _start_step(self) -> bool:
+        """Return True if the step should be rendered."""
+
+        lag = self._time() - self._next_step_time
+        return (lag < self.step or
+                self._skipped_renders >= self.max_skipped_renders)
+
+    def _finish_step(self, render) -> float:
+        """Return delay before the next step."""
+
+        self.steps += 1
+        if render:
+            self.frames += 1
+            self._skipped_renders = 0
+        else:
+            self.dropped_frames += 1
+            self._skipped_renders += 1
+
+        self._next_step_time += self.step
+        delay = self._next_step_time - self._time()
+        if -delay > self.step * self.max_skipped_renders:
+            # too late to catch up, slow down the game instead
+            self._next_step_time = self._time()
+        return delay
+
+    def run(self, step_func: Callable[[bool], bool]):
+        """
+        Call step_func(render) every step until it returns False.
+        Argument render is False if frame should be dropped.
+        """
+
+        self.reset()
+
+        while True:
+            render = self._start_step()
+            if not step_func(render):
+                break
+
+            delay = self._finish_step(render)
+            if delay > 0:
+                self._sleep(delay)
+
+    async def run_async(self, step_func: Callable[[bool], Awaitable[bool]]):
+        """Same as run, but step_func is coroutine function, asyncio sleeps."""
+
+        self.reset()
+
+        while True:
+            render = self._start_step()
+            if not await step_func(render):
+                break
+
+            delay = self._finish_step(render)
+            if delay > 0:
+                await asyncio.sleep(delay)
@@ -1,12 +1,24 @@
+import curses
+import selectors
+import sys
+
+from sprite import Sprite
+
 SPACE_KEY_CODE = 32
 LEFT_KEY_CODE = 260
 RIGHT_KEY_CODE = 261
 UP_KEY_CODE = 259
 DOWN_KEY_CODE = 258
+PAUSE_KEY_CODE = ord('p')
+RESIZE_KEY_CODE = getattr(curses, 'KEY_RESIZE', 410)
 
 
-def read_controls(canvas):
-    """Read keys pressed and returns tuple with controls state."""
+def read_controls(canvas, on_resize=None, on_pause=None):
+    """
+    Read keys pressed and returns tuple with controls state.
+    If terminal is resized, on_resize callback is called,
+    if pause key is pressed — on_pause one.
+    """
     
     rows_direction = columns_direction = 0
     space_pressed = False
@@ -32,16 +44,43 @@ def read_controls(canvas):
 
         if pressed_key_code == SPACE_KEY_CODE:
             space_pressed = True
+
+        if pressed_key_code == RESIZE_KEY_CODE and on_resize is not None:
+            on_resize()
+
+        if pressed_key_code == PAUSE_KEY_CODE and on_pause is not None:
+            on_pause()
     
     return rows_direction, columns_direction, space_pressed
 
 
+def wait_for_keys(timeout=None):
+    """Block until keys are pressed to terminal or timeout passed."""
+
+    with selectors.DefaultSelector() as selector:
+        selector.register(sys.stdin, selectors.EVENT_READ)
+        selector.select(timeout)
+
+
+def beep():
+    """Beep if terminal is initialized, do nothing on headless runs."""
+
+    try:
+        curses.beep()
+    except curses.error:
+        pass
+
+
 def draw_frame(canvas, start_row, start_column, text, negative=False):
     """
     Draw multiline text fragment on canvas, erase text instead of drawing
-        if negative=True is specified.
+        if negative=True is specified. Precompiled sprites are drawn by runs.
     """
-    
+
+    if isinstance(text, Sprite):
+        text.draw(canvas, start_row, start_column, negative)
+        return
+
     rows_number, columns_number = canvas.getmaxyx()
 
     for row, line in enumerate(text.splitlines(), round(start_row)):
@@ -77,7 +116,10 @@ def get_frame_size(text):
     Calculate size of multiline text fragment, return pair —
     number of rows and colums.
     """
-    
+
+    if isinstance(text, Sprite):
+        return text.size
+
     lines = text.splitlines()
     rows = len(lines)
     columns = max([len(line) for line in lines])
@@ -1,6 +1,9 @@
-import asyncio
-import curses
-from curses_tools import draw_frame, get_frame_size
+from array import array
+from typing import Callable, Sequence
+
+from curses_tools import beep, draw_frame
+from scheduler import sleep
+from sprite import Sprite
 
 
 EXPLOSION_FRAMES = [
@@ -29,17 +32,77 @@ EXPLOSION_FRAMES = [
     """,
 ]
 
+EXPLOSION_SPRITES = [Sprite(frame) for frame in EXPLOSION_FRAMES]
+
+
+# minimal ticks between beeps, chain explosions make a single beep
+BEEP_INTERVAL_TICKS = 4
+
+
+class Explosions:
+    """
+    All running explosions kept in parallel arrays as corner position and
+    start tick. Every tick all of them are advanced by one pass: each frame
+    is drawn for a tick and erased on the next one, finished explosions
+    are compacted out of the arrays in the same pass.
+    Explosion starts on the tick after it is added, like a spawned coroutine.
+    """
+
+    def __init__(self, canvas, get_tick: Callable[[], int],
+                 sprites: Sequence[Sprite] = EXPLOSION_SPRITES):
+        self.canvas = canvas
+        self.get_tick = get_tick
+        self.sprites = sprites
+        rows, columns = sprites[0].size
+        self._half_size = rows / 2, columns / 2
+
+        self.rows = array('d')
+        self.columns = array('d')
+        self.start_ticks = array('q')
+
+        self._next_beep_tick = 0
+
+    def __len__(self):
+        return len(self.start_ticks)
+
+    def add(self, center_row: float, center_column: float):
+        half_rows, half_columns = self._half_size
+        self.rows.append(center_row - half_rows)
+        self.columns.append(center_column - half_columns)
+        self.start_ticks.append(self.get_tick() + 1)
+
+    def step(self):
+        canvas, sprites = self.canvas, self.sprites
+        rows, columns, start_ticks = self.rows, self.columns, self.start_ticks
+        tick = self.get_tick()
+        last_age = len(sprites) * 2 - 1
+        next_beep_tick = self._next_beep_tick
 
-async def explode(canvas, center_row, center_column):
-    rows, columns = get_frame_size(EXPLOSION_FRAMES[0])
-    corner_row = center_row - rows / 2
-    corner_column = center_column - columns / 2
+        alive_count = 0
+        for index in range(len(start_ticks)):
+            age = tick - start_ticks[index]
+            if age >= 0:
+                if not age and tick >= next_beep_tick:
+                    next_beep_tick = tick + BEEP_INTERVAL_TICKS
+                    beep()
+                # even ages draw the frame, odd ones erase it
+                frame_index, is_erased = divmod(age, 2)
+                draw_frame(canvas, rows[index], columns[index],
+                           sprites[frame_index], negative=bool(is_erased))
+                if age == last_age:
+                    continue
 
-    curses.beep()
-    for frame in EXPLOSION_FRAMES:
+            if alive_count != index:
+                rows[alive_count] = rows[index]
+                columns[alive_count] = columns[index]
+                start_ticks[alive_count] = start_ticks[index]
+            alive_count += 1
 
-        draw_frame(canvas, corner_row, corner_column, frame)
+        for values in (rows, columns, start_ticks):
+            del values[alive_count:]
+        self._next_beep_tick = next_beep_tick
 
-        await asyncio.sleep(0)
-        draw_frame(canvas, corner_row, corner_column, frame, negative=True)
-        await asyncio.sleep(0)
+    async def animate(self):
+        while True:
+            self.step()
+            await sleep(1)
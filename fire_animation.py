@@ -1,37 +1,123 @@
-import asyncio
-import curses
+from array import array
+from typing import Dict, List, Set, Tuple
 
+from curses_tools import beep
+from scheduler import sleep
+from spatial_grid import SpatialGrid
+from viewport import Viewport
 
-async def fire(canvas, start_row, start_column, obstacles,
-               destoyed_obstacles_ids, rows_speed=-0.3, columns_speed=0):
-    row, column = start_row, start_column
 
-    canvas.addstr(round(row), round(column), '*')
-    await asyncio.sleep(0)
+MAX_BULLETS = 256
+# minimal ticks between shots, 1 lets every tick shoot
+FIRE_INTERVAL_TICKS = 1
 
-    canvas.addstr(round(row), round(column), 'O')
-    await asyncio.sleep(0)
-    canvas.addstr(round(row), round(column), ' ')
+# bullet ages: flash shown on the first ticks, then flight
+FLASH, BLAST, LAUNCH, FLIGHT = 0, 1, 2, 3
 
-    row += rows_speed
-    column += columns_speed
 
-    symbol = '-' if columns_speed else '|'
+class BulletPool:
+    """
+    All flying bullets kept in preallocated arrays. Slots of finished
+    bullets are returned to the free list and reused by next shots.
+    Every tick all bullets are moved and checked for collision in one pass.
+    """
 
-    rows, columns = canvas.getmaxyx()
-    max_row, max_column = rows - 1, columns - 1
+    def __init__(self, canvas, viewport: Viewport, obstacles: SpatialGrid,
+                 destroyed_obstacle_ids: Set[int], capacity=MAX_BULLETS,
+                 fire_interval=FIRE_INTERVAL_TICKS):
+        self.canvas = canvas
+        self.viewport = viewport
+        self.obstacles = obstacles
+        self.destroyed_obstacle_ids = destroyed_obstacle_ids
+        self.fire_interval = fire_interval
 
-    curses.beep()
+        self.rows = array('d', [0]) * capacity
+        self.columns = array('d', [0]) * capacity
+        self.rows_speeds = array('d', [0]) * capacity
+        self.columns_speeds = array('d', [0]) * capacity
+        self.ages = array('B', [0]) * capacity
 
-    while 0 < row < max_row and 0 < column < max_column:
-        canvas.addstr(round(row), round(column), symbol)
-        await asyncio.sleep(0)
-        canvas.addstr(round(row), round(column), ' ')
+        self._free_slots = array('H', reversed(range(capacity)))
+        self._active_slots: List[int] = []
+        self._tick = 0
+        self._last_shot_tick = -fire_interval
 
-        for id_val, obstacle in obstacles.items():
-            if obstacle.has_collision(row, column):
-                destoyed_obstacles_ids.add(id_val)
-                return
+    def __len__(self):
+        return len(self._active_slots)
 
-        row += rows_speed
-        column += columns_speed
+    def fire(self, start_row, start_column, rows_speed=-0.3,
+             columns_speed=0) -> bool:
+        """Launch bullet. Return False if rate of fire or pool is exceeded."""
+
+        if self._tick - self._last_shot_tick < self.fire_interval:
+            return False
+        if not self._free_slots:
+            return False
+
+        slot = self._free_slots.pop()
+        self.rows[slot] = start_row
+        self.columns[slot] = start_column
+        self.rows_speeds[slot] = rows_speed
+        self.columns_speeds[slot] = columns_speed
+        self.ages[slot] = FLASH
+        self._active_slots.append(slot)
+        self._last_shot_tick = self._tick
+        return True
+
+    def get_positions(self) -> Dict[int, Tuple[int, int]]:
+        """Return rounded row and column of flying bullets by slots."""
+
+        return {slot: (round(self.rows[slot]), round(self.columns[slot]))
+                for slot in self._active_slots}
+
+    def step(self):
+        canvas = self.canvas
+        rows, columns = self.rows, self.columns
+        rows_speeds, columns_speeds = self.rows_speeds, self.columns_speeds
+        ages = self.ages
+
+        max_row, max_column = self.viewport.max_row, self.viewport.max_column
+
+        active_slots = []
+        for slot in self._active_slots:
+            row, column, age = rows[slot], columns[slot], ages[slot]
+            rows_speed, columns_speed = rows_speeds[slot], columns_speeds[slot]
+
+            if age == FLASH:
+                canvas.addstr(round(row), round(column), '*')
+            elif age == BLAST:
+                canvas.addstr(round(row), round(column), 'O')
+            else:
+                canvas.addstr(round(row), round(column), ' ')
+
+                if age == LAUNCH:
+                    beep()
+                else:
+                    id_val = self.obstacles.find_swept_collision(
+                        row - rows_speed, column - columns_speed, rows_speed,
+                        columns_speed)
+                    if id_val is not None:
+                        self.destroyed_obstacle_ids.add(id_val)
+                        self._free_slots.append(slot)
+                        continue
+
+                row += rows_speed
+                column += columns_speed
+                if not (0 < row < max_row and 0 < column < max_column):
+                    self._free_slots.append(slot)
+                    continue
+
+                symbol = '-' if columns_speed else '|'
+                canvas.addstr(round(row), round(column), symbol)
+                rows[slot], columns[slot] = row, column
+
+            ages[slot] = min(age + 1, FLIGHT)
+            active_slots.append(slot)
+
+        self._active_slots = active_slots
+        self._tick += 1
+
+    async def animate(self):
+        while True:
+            self.step()
+            await sleep(1)
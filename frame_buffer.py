@@ -0,0 +1,208 @@
+import curses
+from collections import defaultdict
+from typing import List, Tuple
+
+
+BLANK_SYMBOL = ' '
+
+
+def _split_chtype(symbol, attr=0):
+    """Split curses character (str or chtype int) to symbol and attributes."""
+
+    if isinstance(symbol, int):
+        attr |= symbol & curses.A_ATTRIBUTES
+        symbol = chr(symbol & curses.A_CHARTEXT)
+    return symbol, attr
+
+
+class BufferWindow:
+    """
+    Part of the frame buffer, mimics curses window interface used by
+    the game: getmaxyx, addch, addstr, border and derwin.
+    Everything outside of the window is silently clipped.
+    """
+
+    def __init__(self, buffer: 'FrameBuffer', begin_row: int,
+                 begin_column: int, rows: int, columns: int):
+        self._buffer = buffer
+        self._begin_row = begin_row
+        self._begin_column = begin_column
+        self._rows = rows
+        self._columns = columns
+
+    def getmaxyx(self):
+        return self._rows, self._columns
+
+    def derwin(self, nlines, ncols, begin_y, begin_x):
+        return BufferWindow(self._buffer, self._begin_row + begin_y,
+                            self._begin_column + begin_x, nlines, ncols)
+
+    def addch(self, row, column, symbol, attr=0):
+        if not (0 <= row < self._rows and 0 <= column < self._columns):
+            return
+        symbol, attr = _split_chtype(symbol, attr)
+        self._buffer.put(self._begin_row + row, self._begin_column + column,
+                         symbol, attr)
+
+    def addstr(self, row, column, text, attr=0):
+        if not 0 <= row < self._rows:
+            return
+        if column < 0:
+            text = text[-column:]
+            column = 0
+        text = text[:self._columns - column]
+        if text:
+            self._buffer.put_text(self._begin_row + row,
+                                  self._begin_column + column, text, attr)
+
+    def border(self, erase=False):
+        """Draw border of the window, or erase it if erase=True."""
+
+        vline = getattr(curses, 'ACS_VLINE', ord('|'))
+        hline = getattr(curses, 'ACS_HLINE', ord('-'))
+        corners = (
+            (0, 0, getattr(curses, 'ACS_ULCORNER', ord('+'))),
+            (0, self._columns - 1, getattr(curses, 'ACS_URCORNER', ord('+'))),
+            (self._rows - 1, 0, getattr(curses, 'ACS_LLCORNER', ord('+'))),
+            (self._rows - 1, self._columns - 1,
+             getattr(curses, 'ACS_LRCORNER', ord('+'))),
+        )
+        if erase:
+            vline = hline = ord(BLANK_SYMBOL)
+            corners = tuple((row, column, vline)
+                            for row, column, _ in corners)
+
+        symbol, attr = _split_chtype(hline)
+        for row in (0, self._rows - 1):
+            self.addstr(row, 1, symbol * (self._columns - 2), attr)
+        for row in range(1, self._rows - 1):
+            for column in (0, self._columns - 1):
+                self.addch(row, column, vline)
+        for row, column, symbol in corners:
+            self.addch(row, column, symbol)
+
+
+class FrameBuffer(BufferWindow):
+    """
+    Off-screen character/attribute buffer. Coroutines draw into it as into
+    a curses window, flush() pushes to real canvas only the cells changed
+    since the previous flush.
+    """
+
+    def __init__(self, rows: int, columns: int):
+        super().__init__(self, 0, 0, rows, columns)
+        self._symbols = self._make_plane(BLANK_SYMBOL)
+        self._attrs = self._make_plane(0)
+        self._shown_symbols = self._make_plane(BLANK_SYMBOL)
+        self._shown_attrs = self._make_plane(0)
+        # row -> list of (first, last + 1) columns written since the flush
+        self._dirty_spans = defaultdict(list)
+
+    def _make_plane(self, value) -> List[list]:
+        return [[value] * self._columns for _ in range(self._rows)]
+
+    def put(self, row, column, symbol, attr=0):
+        if row >= self._rows or column >= self._columns:
+            return
+        symbols, attrs = self._symbols[row], self._attrs[row]
+        if symbols[column] == symbol and attrs[column] == attr:
+            return
+        symbols[column] = symbol
+        attrs[column] = attr
+        self._dirty_spans[row].append((column, column + 1))
+
+    def resize(self, rows: int, columns: int):
+        """
+        Change size of the buffer keeping its content. Terminal content is
+        unknown after resize, so whole buffer is pushed on the next flush.
+        """
+
+        def resize_plane(plane, value):
+            plane = [(line + [value] * columns)[:columns]
+                     for line in plane[:rows]]
+            plane += [[value] * columns for _ in range(rows - len(plane))]
+            return plane
+
+        self._rows, self._columns = rows, columns
+        self._symbols = resize_plane(self._symbols, BLANK_SYMBOL)
+        self._attrs = resize_plane(self._attrs, 0)
+        self._shown_symbols = self._make_plane(None)
+        self._shown_attrs = self._make_plane(None)
+        self._dirty_spans.clear()
+        for row in range(rows):
+            self._dirty_spans[row].append((0, columns))
+
+    def put_text(self, row, column, text, attr=0):
+        # window made by derwin may be out of the buffer after resize
+        if row >= self._rows or column >= self._columns:
+            return
+        text = text[:self._columns - column]
+        end_column = column + len(text)
+        self._symbols[row][column:end_column] = text
+        self._attrs[row][column:end_column] = [attr] * len(text)
+        self._dirty_spans[row].append((column, end_column))
+
+    def flush(self, canvas):
+        """
+        Push changed cells to canvas. Neighbour changed cells with the same
+        attributes are written with a single addstr call.
+        """
+
+        for row, spans in self._dirty_spans.items():
+            symbols, attrs = self._symbols[row], self._attrs[row]
+            shown_symbols = self._shown_symbols[row]
+            shown_attrs = self._shown_attrs[row]
+
+            for column, end_span in _merge_spans(spans):
+                if (symbols[column:end_span] ==
+                        shown_symbols[column:end_span] and
+                        attrs[column:end_span] == shown_attrs[column:end_span]):
+                    continue
+                self._flush_span(canvas, row, column, end_span)
+
+        self._dirty_spans.clear()
+
+    def _flush_span(self, canvas, row, column, end_span):
+        symbols, attrs = self._symbols[row], self._attrs[row]
+        shown_symbols = self._shown_symbols[row]
+        shown_attrs = self._shown_attrs[row]
+
+        # Curses raises exception after writing to lower right corner of
+        # the window, cause cursor can't be moved further
+        if row == self._rows - 1:
+            end_span = min(end_span, self._columns - 1)
+
+        while column < end_span:
+            if (symbols[column] == shown_symbols[column] and
+                    attrs[column] == shown_attrs[column]):
+                column += 1
+                continue
+
+            attr = attrs[column]
+            end_column = column + 1
+            while (end_column < end_span and
+                   attrs[end_column] == attr and
+                   (symbols[end_column] != shown_symbols[end_column] or
+                    attrs[end_column] != shown_attrs[end_column])):
+                end_column += 1
+
+            text = ''.join(symbols[column:end_column])
+            canvas.addstr(row, column, text, attr)
+            shown_symbols[column:end_column] = symbols[column:end_column]
+            shown_attrs[column:end_column] = attrs[column:end_column]
+            column = end_column
+
+
+def _merge_spans(spans: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Merge overlapping and adjacent column spans."""
+
+    spans.sort()
+    merged = [spans[0]]
+    for column, end_column in spans[1:]:
+        last_column, last_end_column = merged[-1]
+        if column <= last_end_column:
+            if end_column > last_end_column:
+                merged[-1] = (last_column, end_column)
+        else:
+            merged.append((column, end_column))
+    return merged
@@ -1,18 +1,29 @@
 from typing import List, NamedTuple, Tuple
-import time
+import asyncio
 import random
 from random import randint
 import curses
 from itertools import cycle
-import asyncio
 
+from assets import get_sprite
+from asyncio_clock import TaskGroup, TickClock
+from clock import FixedStepClock
 from curses_tools import draw_frame
-from curses_tools import read_controls
-
-from space_garbage import TRASH_FRAMES
-from space_garbage import fly_garbage
-from physics import update_speed
-from fire_animation import fire
+from curses_tools import read_controls, wait_for_keys
+from frame_buffer import FrameBuffer
+from lifecycle import DEAD, PAUSED, PLAYING, Lifecycle
+from scheduler import Scheduler, current_clock, sleep
+from sprite import Sprite
+from star_field import StarField
+from timeline import Timeline
+from viewport import Viewport
+
+from space_garbage import get_trash_frames
+from space_garbage import GarbageField
+from explosion import Explosions
+from physics import get_speed_table
+from fire_animation import BulletPool
+from spatial_grid import SpatialGrid
 
 
 STAR_SYMBOLS = ('+', '*', '.', ':')
@@ -22,25 +33,18 @@ SPACE_FRAME_FILES = ('spaceFrames/frame_0.txt', 'spaceFrames/frame_1.txt')
 BORDER_SIZE = 1
 
 GAME_OVER_FRAME = 'otherFrames/game_over.txt'
-ONE_YEAR_DURATION_IN_SECONDS = 1.5
+# how long idle game waits for keys, before checking terminal size again
+IDLE_TIMEOUT = 0.5
 
-PHRASES = {
-    1957: "First Sputnik",
-    1961: "Gagarin flew!",
-    1969: "Armstrong got on the moon!",
-    1971: "First orbital space station Salute-1",
-    1981: "Flight of the Shuttle Columbia",
-    1998: 'ISS start building',
-    2011: 'Messenger launch to Mercury',
-    2020: "Take the plasma gun! Shoot the garbage!",
-}
+# groups of coroutines, all of them but explosions are cancelled on game over
+SCENE, SHIP, FLYING, EXPLOSIONS = 'scene', 'ship', 'flying', 'explosions'
+TASK_GROUPS = (SCENE, SHIP, FLYING, EXPLOSIONS)
 
 
-def load_space_frames(frame_files=SPACE_FRAME_FILES) -> List[str]:
+def load_space_frames(frame_files=SPACE_FRAME_FILES) -> List[Sprite]:
     result = []
     for path in frame_files:
-        with open(path) as f:
-            result += [''.join(f.readlines())] * 2
+        result += [get_sprite(path)] * 2
     return result
 
 
@@ -49,48 +53,24 @@ class Extent(NamedTuple):
     dy: int
 
 
-def load_game_over_frame(frame_file=GAME_OVER_FRAME):
-    lines = []
-    with open(frame_file, 'r') as f:
-        for line in f:
-            line = line.rstrip()
-            lines.append(line)
-    return lines
+def load_game_over_frame(frame_file=GAME_OVER_FRAME) -> Sprite:
+    return get_sprite(frame_file)
 
 
 def get_space_frame_size(frame_files=SPACE_FRAME_FILES) -> Extent:
     max_x, max_y = 0, 0
     for path in frame_files:
-        with open(path) as f:
-            lines = f.readlines()
-            max_line_size = max((len(x.rstrip()) for x in lines))
-            max_y = max(max_y, len(lines))
-            max_x = max(max_x, max_line_size)
+        sprite = get_sprite(path)
+        max_y = max(max_y, sprite.rows)
+        max_x = max(max_x, sprite.columns)
     return Extent(max_x, max_y)
 
 
-async def sleep(ticks=1):
-    for i in range(ticks):
-        await asyncio.sleep(0)
-
-
-async def star_blink(canvas, y_pos: int, x_pos: int, start_delay: int,
-                     symbol='*'):
-    await sleep(start_delay)
-    while True:
-        canvas.addstr(y_pos, x_pos, symbol, curses.A_DIM)
-        await sleep(20)
-        canvas.addstr(y_pos, x_pos, symbol)
-        await sleep(3)
-        canvas.addstr(y_pos, x_pos, symbol, curses.A_BOLD)
-        await sleep(5)
-        canvas.addstr(y_pos, x_pos, symbol)
-        await sleep(3)
-
-
 class MyGame:
     def __init__(self):
         self.canvas = None
+        self.screen = None
+        self.viewport = Viewport()
 
         self.space_frames = load_space_frames()
         self.space_frame_size = get_space_frame_size()
@@ -99,53 +79,73 @@ class MyGame:
         self.space_y_speed = 0
         self.space_coords = (0, 0)
         self.is_shot = False
-        self.coroutines = []
-        self.obstacles = dict()
+        self.scheduler = Scheduler()
+        self.star_field = None
+        self.garbage_field = None
+        self.bullets = None
+        self.explosions = None
+        self.obstacles = SpatialGrid()
         self.destroyed_obstacle_ids = set()
-        self.is_space_died = False
-        self.current_year = 1957
+        self.lifecycle = Lifecycle()
+        self.lifecycle.on_enter(DEAD, self.tear_down)
+        self.is_game_over_shown = False
+        self.timeline = Timeline.load()
+        self.profiler = None
+        self.clock = FixedStepClock(ANIMATION_DELAY)
+        # function returning controls state, see curses_tools.read_controls
+        self.controls_reader = read_controls
+        # functions called after every frame is shown on the screen
+        self.render_listeners = []
+        # function blocking until keys are pressed or timeout passed,
+        # if not set, idle game does not wait
+        self.input_waiter = None
+        # asyncio mode state, see run_async
+        self.tick_clock = None
+        self.task_groups = None
 
         self.__additional_canvas = None
 
+    @property
+    def is_space_died(self) -> bool:
+        return self.lifecycle.state == DEAD
+
     @property
     def window_size(self) -> Extent:
-        height, width = self.canvas.getmaxyx()
-        return Extent(width, height)
+        return Extent(self.viewport.columns, self.viewport.rows)
 
     @property
     def canvas_center_coords(self) -> Tuple[int, int]:
-        height, width = self.canvas.getmaxyx()
-        x_max = width - 1
-        y_max = height - 1
-        return x_max // 2, y_max // 2
+        y_mid, x_mid = self.viewport.center
+        return x_mid, y_mid
 
     @property
-    def garbage_delay_tics(self) -> int:
-        if self.current_year < 1961:
-            return -1
-        elif self.current_year < 1969:
-            return 20
-        elif self.current_year < 1981:
-            return 14
-        elif self.current_year < 1995:
-            return 10
-        elif self.current_year < 2010:
-            return 8
-        elif self.current_year < 2020:
-            return 6
-        else:
-            return 2
+    def current_year(self) -> int:
+        return self.timeline.current.year
+
+    @current_year.setter
+    def current_year(self, year: int):
+        self.timeline.seek(year)
+
+    def generate_stars(self, skipped_extent: Extent = Extent(0, 0)) -> dict:
+        """
+        Generate stars for the window, stars inside of skipped_extent
+        from the window corner are not generated.
+        """
 
-    def generate_stars(self) -> dict:
         window_extent = self.window_size
         x_max, y_max = window_extent.dx - 1, window_extent.dy - 1
         min_stars_count = x_max * y_max // 20
         max_stars_count = x_max * y_max // 10
 
+        skipped_x_max = skipped_extent.dx - 1 - BORDER_SIZE
+        skipped_y_max = skipped_extent.dy - 1 - BORDER_SIZE
+
         stars = dict()
         for _ in range(randint(min_stars_count, max_stars_count)):
             x = random.randint(BORDER_SIZE, x_max - BORDER_SIZE)
             y = random.randint(BORDER_SIZE, y_max - BORDER_SIZE)
+            if x <= skipped_x_max and y <= skipped_y_max:
+                continue
             if (x, y) not in stars:
                 delay = random.randint(0, MAX_STAR_DELAY)
                 stars[(x, y)] = [random.choice(STAR_SYMBOLS), delay]
@@ -164,126 +164,308 @@ class MyGame:
         return x, y
 
     async def space_animation(self):
+        previous_x, previous_y = self.space_coords
         for frame in cycle(self.space_frames):
             x, y = self.space_coords
-            for obstacle in self.obstacles.values():
-                if obstacle.has_collision(y, x, self.space_frame_size.dy,
-                                          self.space_frame_size.dx):
-                    self.is_space_died = True
+            collided_id = self.obstacles.find_swept_collision(
+                previous_y, previous_x, y - previous_y, x - previous_x,
+                self.space_frame_size.dy, self.space_frame_size.dx,
+                frame.mask)
+            if collided_id is not None:
+                self.lifecycle.switch(DEAD)
+                if self.is_space_died:
                     return
 
+            previous_x, previous_y = x, y
             draw_frame(self.canvas, y, x, frame)
             await sleep(1)
             draw_frame(self.canvas, y, x, frame, negative=True)
 
     async def add_fire(self):
         while True:
-            if self.is_shot and self.current_year > 2019:
-                coroutine = fire(self.canvas, self.space_coords[1],
-                                 self.space_coords[0] + 2,
-                                 self.obstacles, self.destroyed_obstacle_ids)
-                self.coroutines.append(coroutine)
+            if self.is_shot and self.timeline.current.is_weapon_unlocked:
+                self.bullets.fire(self.space_coords[1],
+                                  self.space_coords[0] + 2)
             await sleep(1)
 
     async def fill_orbit_with_garbage(self):
-        id_val = 0
         while True:
-            if self.garbage_delay_tics < 0:
+            garbage_delay = self.timeline.current.garbage_delay
+            if garbage_delay < 0:
                 await sleep(1)
                 continue
             else:
-                await sleep(self.garbage_delay_tics)
+                await sleep(garbage_delay)
 
             max_x = self.window_size.dx - BORDER_SIZE
             start_x = randint(1, max_x - 1)
-            frame = random.choice(TRASH_FRAMES)
+            frame_index = random.randrange(len(get_trash_frames()))
+            self.garbage_field.add(start_x, frame_index)
 
-            coroutine = fly_garbage(self.canvas, start_x, frame, id_val,
-                                    self.obstacles,
-                                    self.destroyed_obstacle_ids)
-            self.coroutines.append(coroutine)
-            id_val += 1
+    def explode_garbage(self, center_row, center_column):
+        self.explosions.add(center_row, center_column)
 
     def get_game_over_text_position(self):
         canvas_x_mid, canvas_y_mid = self.canvas_center_coords
-        label_width_mid = len(self.game_over_frame[1]) / 2
-        label_height_mid = len(self.game_over_frame) / 2
+        label_rows, label_columns = self.game_over_frame.size
 
-        x_mid = int(canvas_x_mid - label_width_mid)
-        y_mid = int(canvas_y_mid - label_height_mid)
+        x_mid = int(canvas_x_mid - label_columns / 2)
+        y_mid = int(canvas_y_mid - label_rows / 2)
         return x_mid, y_mid
 
-    async def show_game_over(self):
+    def draw_game_over(self, negative=False):
         x_pos, y_pos = self.get_game_over_text_position()
-        frame_text = '\n'.join(self.game_over_frame)
-        while True:
-            if self.is_space_died:
-                draw_frame(self.canvas, y_pos, x_pos, frame_text)
-            await asyncio.sleep(0)
+        draw_frame(self.canvas, y_pos, x_pos, self.game_over_frame, negative)
 
     async def show_year_label(self):
-        new_window = self.canvas.derwin(1, self.window_size.dx - 2, 1, 1)
         while not self.is_space_died:
-            history_fact = PHRASES.get(self.current_year, '')
-            text = f'Year: {self.current_year} {history_fact}'
-            if history_fact:
-                for _ in range(10):
-                    draw_frame(new_window, 0, 0, text)
-                    await sleep(1)
-            else:
-                draw_frame(new_window, 0, 0, text)
-            await sleep(1)
-            draw_frame(new_window, 0, 0, text, negative=True)
+            new_window = self.canvas.derwin(1, self.window_size.dx - 2, 1, 1)
+            year = self.timeline.current
+            try:
+                if year.phrase:
+                    for _ in range(10):
+                        draw_frame(new_window, 0, 0, year.label)
+                        await sleep(1)
+                else:
+                    draw_frame(new_window, 0, 0, year.label)
+                await sleep(1)
+            finally:
+                # label is erased also when it is cancelled on game over
+                draw_frame(new_window, 0, 0, year.label, negative=True)
+
+    def spawn(self, coroutine, group=SCENE):
+        """Start coroutine by scheduler or as a task of asyncio mode."""
+
+        if self.task_groups is None:
+            self.scheduler.spawn(coroutine, group=group)
+        else:
+            self.task_groups[group].spawn(coroutine)
+
+    def cancel_group(self, group):
+        if self.task_groups is None:
+            self.scheduler.cancel_group(group)
+        else:
+            self.task_groups[group].cancel()
+
+    @property
+    def tick_number(self) -> int:
+        if self.task_groups is None:
+            return self.scheduler.tick
+        return self.tick_clock.tick
+
+    @property
+    def coroutines_count(self) -> int:
+        if self.task_groups is None:
+            return len(self.scheduler)
+        return sum(map(len, self.task_groups.values()))
+
+    def tear_down(self):
+        """
+        Stop everything but explosions on game over, scene freezes.
+        Game over frame is shown when the last explosion is finished,
+        see finish_explosions.
+        """
+
+        for group in (SHIP, FLYING, SCENE):
+            self.cancel_group(group)
+
+    @property
+    def is_idle(self) -> bool:
+        """True if game is paused or nothing animates after game over."""
+
+        if self.lifecycle.state == PAUSED:
+            return True
+        return self.lifecycle.state == DEAD and self.is_game_over_shown
+
+    def setup(self, canvas):
+        """Prepare game for the canvas and start all its coroutines."""
 
-    def run(self, canvas):
         canvas.nodelay(True)
-        curses.curs_set(False)
 
-        self.canvas = canvas
+        rows, columns = canvas.getmaxyx()
+        self.screen = canvas
+        self.viewport.resize(rows, columns)
+        self.canvas = FrameBuffer(rows, columns)
+        self.scheduler.profiler = self.profiler
 
-        stars = self.generate_stars()
-        for star_coords, attributes in stars.items():
-            x, y = star_coords
-            symbol, delay = attributes
-            self.coroutines.append(star_blink(canvas, y, x, delay, symbol))
+        self.star_field = StarField(self.generate_stars())
+        self.spawn(self.star_field.animate(self.canvas))
 
         self.space_coords = self.canvas_center_coords
-        self.coroutines.append(self.space_animation())
+        self.spawn(self.space_animation(), SHIP)
+
+        self.garbage_field = GarbageField(self.canvas, self.viewport,
+                                          self.obstacles,
+                                          self.destroyed_obstacle_ids,
+                                          self.explode_garbage)
+        self.spawn(self.garbage_field.animate(), FLYING)
+        self.bullets = BulletPool(self.canvas, self.viewport, self.obstacles,
+                                  self.destroyed_obstacle_ids,
+                                  fire_interval=self.timeline.fire_interval)
+        self.spawn(self.bullets.animate(), FLYING)
+        self.spawn(self.fill_orbit_with_garbage(), FLYING)
+        self.spawn(self.add_fire(), SHIP)
+        self.spawn(self.show_year_label())
+        self.explosions = Explosions(self.canvas, lambda: self.tick_number)
+        self.spawn(self.explosions.animate(), EXPLOSIONS)
+
+    def resize(self):
+        """Fit the game to the new size of terminal."""
+
+        rows, columns = self.screen.getmaxyx()
+        old_size = self.window_size
+        # erased at the old center, the frame is the same if size is not
+        # changed
+        if self.is_game_over_shown:
+            self.draw_game_over(negative=True)
+        if self.viewport.resize(rows, columns):
+            self.canvas.border(erase=True)
+            self.canvas.resize(rows, columns)
+            self.star_field.resize(rows - 1 - BORDER_SIZE,
+                                   columns - 1 - BORDER_SIZE,
+                                   self.generate_stars(old_size))
+            self.space_coords = self.get_space_corrected_coords(
+                *self.space_coords)
+        if self.is_game_over_shown:
+            self.draw_game_over()
+
+    def apply_controls(self, canvas):
+        y_direction, x_direction, is_shot = self.controls_reader(
+            canvas, self.resize, self.lifecycle.toggle_pause)
+        if self.lifecycle.state != PLAYING:
+            return
+
+        self.is_shot = is_shot and self.timeline.current.is_weapon_unlocked
+
+        x, y = self.space_coords
+        v_x, v_y = self.space_x_speed, self.space_y_speed
+
+        speed_table = get_speed_table()
+        v_y = speed_table.update(v_y, y_direction)
+        v_x = speed_table.update(v_x, x_direction)
+        x += v_x
+        y += v_y
+
+        self.space_x_speed, self.space_y_speed = v_x, v_y
+        self.space_coords = self.get_space_corrected_coords(x, y)
+
+    def render(self, canvas):
+        self.canvas.border()
+        if self.profiler is not None:
+            self.profiler.draw_overlay(self.canvas)
+        self.canvas.flush(canvas)
+        canvas.refresh()
+        for listener in self.render_listeners:
+            listener()
+
+    def end_tick(self, coroutines_count):
+        if self.profiler is not None:
+            self.profiler.end_tick(coroutines_count, len(self.obstacles))
+        self.timeline.end_tick()
+
+    def wait_idle(self, canvas):
+        """
+        Show changes made by controls, e.g. by resize, and block until keys
+        are pressed, as nothing animates.
+        """
+
+        self.render(canvas)
+        if self.input_waiter is not None:
+            self.input_waiter(IDLE_TIMEOUT)
+            self.clock.reset()
+
+    def finish_explosions(self):
+        """Show game over frame after the last explosion is finished."""
+
+        if self.is_space_died and not self.explosions:
+            self.cancel_group(EXPLOSIONS)
+            self.draw_game_over()
+            self.is_game_over_shown = True
+
+    def tick(self, canvas, render=True) -> bool:
+        """
+        Simulate one tick and render it, unless render=False is specified.
+        Paused game and game over screen do not simulate ticks, but wait
+        for keys instead.
+        """
+
+        if self.profiler is not None:
+            self.profiler.start_tick()
+
+        self.apply_controls(canvas)
+        if self.is_idle:
+            self.wait_idle(canvas)
+            return True
+
+        self.scheduler.run_tick()
+        self.finish_explosions()
+
+        if render or self.is_game_over_shown:
+            self.render(canvas)
+        self.end_tick(len(self.scheduler))
+        return True
+
+    async def tick_async(self, canvas, render=True) -> bool:
+        """Same as tick, but coroutines are run as tasks of asyncio loop."""
+
+        if self.profiler is not None:
+            self.profiler.start_tick()
+
+        self.apply_controls(canvas)
+        if self.is_idle:
+            self.render(canvas)
+            if self.input_waiter is not None:
+                await asyncio.get_event_loop().run_in_executor(
+                    None, self.input_waiter, IDLE_TIMEOUT)
+                self.clock.reset()
+            return True
+
+        self.tick_clock.start_tick()
+        # let woken and just spawned tasks run their step of the tick
+        await asyncio.sleep(0)
 
-        self.coroutines.append(self.fill_orbit_with_garbage())
-        self.coroutines.append(self.add_fire())
-        self.coroutines.append(self.show_game_over())
-        self.coroutines.append(self.show_year_label())
+        for group in self.task_groups.values():
+            if group.error is not None:
+                raise group.error
+        self.finish_explosions()
 
-        snap_index = 0
-        while True:
-            if not self.is_space_died:
-                y_direction, x_direction, is_shot = read_controls(canvas)
-                self.is_shot = is_shot and self.current_year > 2019
-
-                x, y = self.space_coords
-                v_x, v_y = self.space_x_speed, self.space_y_speed
-
-                v_y, v_x = update_speed(v_y, v_x, y_direction, x_direction)
-                x += v_x
-                y += v_y
-
-                self.space_x_speed, self.space_y_speed = v_x, v_y
-                self.space_coords = self.get_space_corrected_coords(x, y)
-
-            for coroutine in self.coroutines.copy():
-                try:
-                    coroutine.send(None)
-                except StopIteration:
-                    self.coroutines.remove(coroutine)
-            if len(self.coroutines) == 0:
-                break
-
-            canvas.refresh()
-            canvas.border()
-            time.sleep(ANIMATION_DELAY)
-
-            if not snap_index % (
-                    ONE_YEAR_DURATION_IN_SECONDS / ANIMATION_DELAY):
-                self.current_year += 1
-            snap_index += 1
+        if render or self.is_game_over_shown:
+            self.render(canvas)
+        self.end_tick(self.coroutines_count)
+        self.tick_clock.end_tick()
+        return True
+
+    def run(self, canvas):
+        curses.curs_set(False)
+        if self.input_waiter is None:
+            self.input_waiter = wait_for_keys
+        if self.profiler is not None:
+            canvas = self.profiler.wrap_canvas(canvas)
+        self.setup(canvas)
+        self.clock.run(lambda render: self.tick(canvas, render))
+
+    async def run_async(self, canvas):
+        """
+        Run the game on asyncio loop: coroutines are tasks sleeping until
+        the frame of the tick clock, so the game can share the loop with
+        other asyncio code.
+        """
+
+        curses.curs_set(False)
+        if self.input_waiter is None:
+            self.input_waiter = wait_for_keys
+        if self.profiler is not None:
+            canvas = self.profiler.wrap_canvas(canvas)
+
+        self.tick_clock = TickClock()
+        current_clock.set(self.tick_clock)
+        self.task_groups = {name: TaskGroup(name) for name in TASK_GROUPS}
+        self.setup(canvas)
+        try:
+            await self.clock.run_async(
+                lambda render: self.tick_async(canvas, render))
+        finally:
+            for group in self.task_groups.values():
+                group.cancel()
+            for group in self.task_groups.values():
+                await group.wait()
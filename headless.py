@@ -0,0 +1,188 @@
+"""
+Run the game without terminal: python3 headless.py --ticks 1000
+
+Script file for --script option contains keys pressed on every tick,
+one line per tick, e.g. "up space". Empty line means no keys pressed.
+"""
+import argparse
+import curses
+import random
+import time
+from typing import Iterable, List, NamedTuple, Optional, Sequence
+
+from curses_tools import (DOWN_KEY_CODE, LEFT_KEY_CODE, PAUSE_KEY_CODE,
+                          RESIZE_KEY_CODE, RIGHT_KEY_CODE, SPACE_KEY_CODE,
+                          UP_KEY_CODE)
+from game import MyGame
+from profiler import TickProfiler
+from timeline import TIMELINE_FILE, Timeline
+
+
+KEY_CODES = {
+    'up': UP_KEY_CODE,
+    'down': DOWN_KEY_CODE,
+    'left': LEFT_KEY_CODE,
+    'right': RIGHT_KEY_CODE,
+    'space': SPACE_KEY_CODE,
+    'pause': PAUSE_KEY_CODE,
+}
+
+DEFAULT_ROWS = 40
+DEFAULT_COLUMNS = 120
+
+
+class HeadlessCanvas:
+    """
+    Curses window stand-in keeping screen content in memory.
+    Keys returned by getch are taken from script — sequence of key codes
+    for every tick, the tick is finished by refresh call.
+    """
+
+    def __init__(self, rows=DEFAULT_ROWS, columns=DEFAULT_COLUMNS,
+                 script: Iterable[Sequence[int]] = (), begin_row=0,
+                 begin_column=0, parent: 'HeadlessCanvas' = None):
+        self._rows = rows
+        self._columns = columns
+        self._begin_row = begin_row
+        self._begin_column = begin_column
+
+        if parent is None:
+            self._screen = [[' '] * columns for _ in range(rows)]
+            self._script = iter(script)
+            self._keys: List[int] = []
+            self._next_keys()
+        else:
+            self._screen = parent._screen
+
+    def _next_keys(self):
+        self._keys = list(next(self._script, ()))
+        self._keys.reverse()
+
+    def getmaxyx(self):
+        return self._rows, self._columns
+
+    def resize(self, rows, columns):
+        """Resize terminal, getch reports it same way as curses does."""
+
+        self._screen[:] = [(line + [' '] * columns)[:columns]
+                           for line in self._screen[:rows]]
+        self._screen += [[' '] * columns
+                         for _ in range(rows - len(self._screen))]
+        self._rows, self._columns = rows, columns
+        self._keys.insert(0, RESIZE_KEY_CODE)
+
+    def nodelay(self, flag):
+        pass
+
+    def border(self):
+        pass
+
+    def refresh(self):
+        self._next_keys()
+
+    def getch(self):
+        return self._keys.pop() if self._keys else -1
+
+    def derwin(self, nlines, ncols, begin_y, begin_x):
+        return HeadlessCanvas(nlines, ncols,
+                              begin_row=self._begin_row + begin_y,
+                              begin_column=self._begin_column + begin_x,
+                              parent=self)
+
+    def addch(self, row, column, symbol, attr=0):
+        if isinstance(symbol, int):
+            symbol = chr(symbol & curses.A_CHARTEXT)
+        self.addstr(row, column, symbol, attr)
+
+    def addstr(self, row, column, text, attr=0):
+        if not (0 <= row < self._rows and
+                0 <= column and column + len(text) <= self._columns):
+            raise curses.error(f'addstr() out of window: {row}, {column}')
+        row += self._begin_row
+        column += self._begin_column
+        self._screen[row][column:column + len(text)] = text
+
+    def dump(self) -> str:
+        """Return screen content as multiline text."""
+
+        return '\n'.join(''.join(line) for line in self._screen)
+
+
+def parse_script(lines: Iterable[str]) -> List[List[int]]:
+    """Convert lines with key names to key codes for every tick."""
+
+    return [[KEY_CODES[name] for name in line.lower().split()]
+            for line in lines]
+
+
+class HeadlessResult(NamedTuple):
+    ticks: int
+    seconds: float
+    game: MyGame
+    canvas: HeadlessCanvas
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.ticks / self.seconds if self.seconds else float('inf')
+
+
+def run_headless(ticks: int, rows=DEFAULT_ROWS, columns=DEFAULT_COLUMNS,
+                 script: Iterable[Sequence[int]] = (),
+                 seed: Optional[int] = None,
+                 game: Optional[MyGame] = None) -> HeadlessResult:
+    """Simulate game for number of ticks as fast as possible."""
+
+    if seed is not None:
+        random.seed(seed)
+
+    game = game or MyGame()
+    screen = canvas = HeadlessCanvas(rows, columns, script)
+    if game.profiler is not None:
+        canvas = game.profiler.wrap_canvas(screen)
+    game.setup(canvas)
+
+    passed_ticks = 0
+    start_time = time.perf_counter()
+    while passed_ticks < ticks and game.tick(canvas):
+        passed_ticks += 1
+    seconds = time.perf_counter() - start_time
+
+    return HeadlessResult(passed_ticks, seconds, game, screen)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run game without terminal')
+    parser.add_argument('--ticks', type=int, default=1000)
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS)
+    parser.add_argument('--columns', type=int, default=DEFAULT_COLUMNS)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--script', type=argparse.FileType('r'),
+                        help='file with keys pressed, one line per tick')
+    parser.add_argument('--dump', action='store_true',
+                        help='print the last frame')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='dump tick stats to file')
+    parser.add_argument('--timeline', metavar='FILE', default=TIMELINE_FILE,
+                        help='config of game years and difficulty')
+    args = parser.parse_args()
+
+    game = MyGame()
+    game.timeline = Timeline.load(args.timeline)
+    if args.profile:
+        game.profiler = TickProfiler()
+
+    script = parse_script(args.script) if args.script else ()
+    result = run_headless(args.ticks, args.rows, args.columns, script,
+                          args.seed, game)
+    if args.profile:
+        game.profiler.dump(args.profile)
+
+    if args.dump:
+        print(result.canvas.dump())
+    print(f'ticks: {result.ticks}, seconds: {result.seconds:.3f}, '
+          f'ticks per second: {result.ticks_per_second:.1f}, '
+          f'year: {result.game.current_year}')
+
+
+if __name__ == '__main__':
+    main()
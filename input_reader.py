@@ -0,0 +1,202 @@
+import curses
+import os
+import selectors
+import signal
+import threading
+from collections import deque
+from time import perf_counter
+from typing import Deque, Dict, FrozenSet, NamedTuple, Optional, Tuple
+
+from curses_tools import (DOWN_KEY_CODE, LEFT_KEY_CODE, PAUSE_KEY_CODE,
+                          RIGHT_KEY_CODE, SPACE_KEY_CODE, UP_KEY_CODE)
+
+
+ESCAPE_SEQUENCES = {
+    b'\x1b[A': UP_KEY_CODE,
+    b'\x1b[B': DOWN_KEY_CODE,
+    b'\x1b[C': RIGHT_KEY_CODE,
+    b'\x1b[D': LEFT_KEY_CODE,
+    # keypad transmit mode, enabled by curses.wrapper
+    b'\x1bOA': UP_KEY_CODE,
+    b'\x1bOB': DOWN_KEY_CODE,
+    b'\x1bOC': RIGHT_KEY_CODE,
+    b'\x1bOD': LEFT_KEY_CODE,
+}
+# ticks without events of the held key, when it is still considered held:
+# terminal repeats held key with its own rate, not synchronized with ticks
+HOLD_GAP_TICKS = 1
+LATENCY_WINDOW = 100
+
+
+class ControlsSnapshot(NamedTuple):
+    rows_direction: int
+    columns_direction: int
+    space_pressed: bool
+    pressed: FrozenSet[int]
+    held: FrozenSet[int]
+
+
+def parse_keys(data: bytes) -> Tuple[list, bytes]:
+    """
+    Convert bytes read from terminal to key codes.
+    Return codes and incomplete escape sequence left in the end.
+    """
+
+    codes = []
+    position = 0
+    while position < len(data):
+        if data[position] != 0x1b:
+            codes.append(data[position])
+            position += 1
+            continue
+
+        sequence = data[position:position + 3]
+        if len(sequence) < 3:
+            return codes, data[position:]
+        if sequence in ESCAPE_SEQUENCES:
+            codes.append(ESCAPE_SEQUENCES[sequence])
+            position += 3
+        else:
+            position += 1
+    return codes, b''
+
+
+class InputReader:
+    """
+    Controls reader working off the tick path. Dedicated thread waits for
+    terminal input, decodes keys and puts them to the queue with time of
+    arrival. On every tick queued keys are coalesced to the controls state,
+    keys repeated by terminal are tracked as held.
+
+    Terminal resize is caught by SIGWINCH handler, as curses getch is not
+    called anymore.
+    """
+
+    def __init__(self, fd: Optional[int] = None):
+        self.fd = fd if fd is not None else 0
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+        self._events: Deque[Tuple[float, int]] = deque()
+        self._last_seen: Dict[int, int] = dict()
+        self._repeats: Dict[int, int] = dict()
+        self._tick = 0
+        self._first_event_time: Optional[float] = None
+        self._is_resized = False
+        self._has_input = threading.Event()
+
+        self._stop_reader, self._stop_writer = os.pipe()
+        self._thread = threading.Thread(target=self._read, daemon=True)
+
+    def start(self):
+        if hasattr(signal, 'SIGWINCH'):
+            signal.signal(signal.SIGWINCH, self._handle_resize)
+        self._thread.start()
+
+    def close(self):
+        os.write(self._stop_writer, b'\0')
+        self._thread.join()
+        os.close(self._stop_reader)
+        os.close(self._stop_writer)
+
+    def _handle_resize(self, signum, frame):
+        self._is_resized = True
+        self._has_input.set()
+
+    def wait(self, timeout=None):
+        """Block until keys are pressed, terminal resized or timeout passed."""
+
+        self._has_input.wait(timeout)
+        self._has_input.clear()
+
+    def _read(self):
+        selector = selectors.DefaultSelector()
+        selector.register(self.fd, selectors.EVENT_READ)
+        selector.register(self._stop_reader, selectors.EVENT_READ)
+
+        tail = b''
+        while True:
+            for key, _ in selector.select():
+                if key.fd == self._stop_reader:
+                    selector.close()
+                    return
+                data = os.read(self.fd, 1024)
+                if not data:
+                    selector.close()
+                    return
+
+                codes, tail = parse_keys(tail + data)
+                arrival_time = perf_counter()
+                self._events.extend((arrival_time, code) for code in codes)
+                self._has_input.set()
+
+    def snapshot(self) -> ControlsSnapshot:
+        """Coalesce keys arrived since the previous tick."""
+
+        self._tick += 1
+        rows_direction = columns_direction = 0
+        pressed = set()
+
+        while self._events:
+            arrival_time, code = self._events.popleft()
+            if self._first_event_time is None:
+                self._first_event_time = arrival_time
+
+            ticks_passed = self._tick - self._last_seen.get(code, -2)
+            if ticks_passed <= 1 + HOLD_GAP_TICKS:
+                self._repeats[code] = self._repeats.get(code, 0) + 1
+            else:
+                self._repeats[code] = 0
+            self._last_seen[code] = self._tick
+            pressed.add(code)
+
+        held = frozenset(
+            code for code, last_seen in self._last_seen.items()
+            if self._repeats.get(code) and
+            self._tick - last_seen <= HOLD_GAP_TICKS
+        )
+
+        active = pressed | held
+        if UP_KEY_CODE in active:
+            rows_direction = -1
+        if DOWN_KEY_CODE in active:
+            rows_direction = 1 if rows_direction == 0 else 0
+        if RIGHT_KEY_CODE in active:
+            columns_direction = 1
+        if LEFT_KEY_CODE in active:
+            columns_direction = -1 if columns_direction == 0 else 0
+
+        return ControlsSnapshot(rows_direction, columns_direction,
+                                SPACE_KEY_CODE in active, frozenset(pressed),
+                                held)
+
+    def __call__(self, canvas, on_resize=None,
+                 on_pause=None) -> Tuple[int, int, bool]:
+        """Return controls state same way as curses_tools.read_controls."""
+
+        if self._is_resized:
+            self._is_resized = False
+            columns, rows = os.get_terminal_size(self.fd)
+            curses.resizeterm(rows, columns)
+            if on_resize is not None:
+                on_resize()
+
+        rows_direction, columns_direction, space_pressed, pressed, _ = (
+            self.snapshot())
+        if PAUSE_KEY_CODE in pressed and on_pause is not None:
+            on_pause()
+        return rows_direction, columns_direction, space_pressed
+
+    def rendered(self):
+        """Mark frame rendered, measure latency from the first key to it."""
+
+        if self._first_event_time is not None:
+            self.latencies.append(perf_counter() - self._first_event_time)
+            self._first_event_time = None
+
+    def get_latency_stats(self) -> Dict[str, float]:
+        if not self.latencies:
+            return {'avg_ms': 0.0, 'max_ms': 0.0}
+        return {
+            'avg_ms': sum(self.latencies) / len(self.latencies) * 1000,
+            'max_ms': max(self.latencies) * 1000,
+        }
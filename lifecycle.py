@@ -0,0 +1,39 @@
+from collections import defaultdict
+from typing import Callable, Dict, List
+
+
+PLAYING, PAUSED, DEAD = 'playing', 'paused', 'dead'
+
+
+class Lifecycle:
+    """
+    State of the game: playing, paused or dead after the ship crash.
+    Handlers registered for a state are called when game enters it,
+    e.g. to tear down subsystems not needed after game over.
+    """
+
+    def __init__(self):
+        self.state = PLAYING
+        self._handlers: Dict[str, List[Callable[[], None]]] = defaultdict(
+            list)
+
+    def __repr__(self):
+        return f'Lifecycle(state={self.state!r})'
+
+    def on_enter(self, state: str, handler: Callable[[], None]):
+        self._handlers[state].append(handler)
+
+    def switch(self, state: str):
+        if state == self.state:
+            return
+        self.state = state
+        for handler in self._handlers[state]:
+            handler()
+
+    def toggle_pause(self):
+        """Pause playing game or resume paused one, dead game is ignored."""
+
+        if self.state == PLAYING:
+            self.switch(PAUSED)
+        elif self.state == PAUSED:
+            self.switch(PLAYING)
@@ -1,11 +1,97 @@
+import argparse
+import asyncio
 import curses
 
+from curses_tools import read_controls
 from game import MyGame
+from input_reader import InputReader
+from profiler import TickProfiler
+from replay import Recorder, get_timeline_checksum, new_seed
+from spectator import StatePublisher
+from split_render import SplitRenderer
+from timeline import TIMELINE_FILE, Timeline
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Space game')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='show tick stats overlay and dump them to file '
+                             'on exit')
+    parser.add_argument('--record', metavar='FILE',
+                        type=argparse.FileType('wb'),
+                        help='record session to replay it by replay.py')
+    parser.add_argument('--getch-input', action='store_true',
+                        help='read keys by curses getch on every tick '
+                             'instead of the input thread')
+    parser.add_argument('--split', action='store_true',
+                        help='simulate game in a separate process')
+    parser.add_argument('--asyncio', action='store_true',
+                        help='run game coroutines as asyncio tasks')
+    parser.add_argument('--timeline', metavar='FILE', default=TIMELINE_FILE,
+                        help='config of game years and difficulty')
+    parser.add_argument('--publish', metavar='SOCKET',
+                        help='publish game state to unix socket for '
+                             'spectator.py')
+    args = parser.parse_args()
+    if args.split and (args.profile or args.record or args.asyncio or
+                       args.publish):
+        parser.error('--split can not be used with --profile, --record, '
+                     '--asyncio or --publish')
+
+    game = MyGame()
+    game.timeline = Timeline.load(args.timeline)
+    renderer = SplitRenderer(timeline_file=args.timeline)
+    render_listeners = renderer.render_listeners if args.split else (
+        game.render_listeners)
+    if args.profile:
+        game.profiler = TickProfiler()
+
+    input_reader = None
+    controls_reader = read_controls
+    if not args.getch_input:
+        input_reader = InputReader()
+        controls_reader = input_reader
+        render_listeners.append(input_reader.rendered)
+        game.input_waiter = input_reader.wait
+    if args.record:
+        controls_reader = Recorder(controls_reader, args.record, new_seed(),
+                                   get_timeline_checksum(args.timeline))
+    game.controls_reader = controls_reader
+    publisher = None
+    if args.publish:
+        publisher = StatePublisher(args.publish)
+        game.render_listeners.append(lambda: publisher.publish(game))
+    renderer.controls_reader = controls_reader
+
     curses.update_lines_cols()
-    curses.wrapper(MyGame().run)
+    if input_reader is not None:
+        input_reader.start()
+    if args.split:
+        run = renderer.run
+    elif args.asyncio:
+        def run(screen):
+            asyncio.run(game.run_async(screen))
+    else:
+        run = game.run
+    try:
+        curses.wrapper(run)
+    finally:
+        if input_reader is not None:
+            input_reader.close()
+            latency = input_reader.get_latency_stats()
+            print(f'Input latency: avg {latency["avg_ms"]:.1f} ms, '
+                  f'max {latency["max_ms"]:.1f} ms')
+        if game.profiler is not None:
+            game.profiler.dump(args.profile)
+        if args.record:
+            args.record.close()
+        if publisher is not None:
+            publisher.close()
+        if args.split:
+            print(f'Frames rendered: {renderer.frames_count}')
+        else:
+            print(f'Frames rendered: {game.clock.frames}, '
+                  f'dropped: {game.clock.dropped_frames}')
 
 
 if __name__ == '__main__':
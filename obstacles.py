@@ -1,14 +1,33 @@
-import asyncio
+import math
+from functools import lru_cache
+from typing import List
+
 from curses_tools import draw_frame
+from scheduler import sleep
 
 
 class Obstacle:
-    def __init__(self, row, column, rows_size=1, columns_size=1, uid=None):
+    __slots__ = ('row', 'column', 'previous_row', 'previous_column',
+                 'rows_size', 'columns_size', 'uid', 'mask')
+
+    def __init__(self, row, column, rows_size=1, columns_size=1, uid=None,
+                 mask=None):
+        self.reset(row, column, rows_size, columns_size, uid, mask)
+
+    def reset(self, row, column, rows_size=1, columns_size=1, uid=None,
+              mask=None):
+        """Initialize obstacle again, e.g. when it is reused by pool."""
+
         self.row = row
         self.column = column
+        # position before the last move, used by swept collision check
+        self.previous_row = row
+        self.previous_column = column
         self.rows_size = rows_size
         self.columns_size = columns_size
         self.uid = uid
+        # occupied cells, see sprite.Sprite.mask, None means the whole box
+        self.mask = mask
 
     def get_bounding_box_frame(self):
         # increment box size to compensate obstacle movement
@@ -26,16 +45,73 @@ class Obstacle:
                       obj_corner_row,
                       obj_corner_column,
                       obj_size_rows=1,
-                      obj_size_columns=1):
+                      obj_size_columns=1,
+                      obj_mask=None):
         # Determine if collision has occured. Return True or False.
-        return has_collision(
-            (self.row, self.column),
-            (self.rows_size, self.columns_size),
-            (obj_corner_row, obj_corner_column),
-            (obj_size_rows, obj_size_columns),
+        # Positions are checked as they are, moving objects of the game
+        # are checked by has_swept_collision instead.
+        if self.mask is None and obj_mask is None:
+            return _has_box_collision(
+                self.row, self.column, self.rows_size, self.columns_size,
+                obj_corner_row, obj_corner_column, obj_size_rows,
+                obj_size_columns)
+
+        return has_mask_collision(
+            self.row, self.column,
+            self.mask or get_box_mask(self.rows_size, self.columns_size),
+            obj_corner_row, obj_corner_column,
+            obj_mask or get_box_mask(obj_size_rows, obj_size_columns),
+        )
+
+    def has_swept_collision(self,
+                            obj_corner_row,
+                            obj_corner_column,
+                            obj_row_move,
+                            obj_column_move,
+                            obj_size_rows=1,
+                            obj_size_columns=1,
+                            obj_mask=None):
+        """
+        Determine if object moving from the corner position by the move
+        collides with obstacle during its last move. Return True or False.
+        """
+
+        return has_swept_collision(
+            self.previous_row, self.previous_column,
+            self.mask or get_box_mask(self.rows_size, self.columns_size),
+            self.row - self.previous_row,
+            self.column - self.previous_column,
+            obj_corner_row, obj_corner_column,
+            obj_mask or get_box_mask(obj_size_rows, obj_size_columns),
+            obj_row_move, obj_column_move,
         )
 
 
+class ObstaclePool:
+    """
+    Free list of obstacles. Obstacles removed from the game are returned
+    to the pool and reused for new ones instead of allocating them.
+    """
+
+    def __init__(self):
+        self._free: List[Obstacle] = []
+
+    def __len__(self):
+        return len(self._free)
+
+    def acquire(self, row, column, rows_size=1, columns_size=1, uid=None,
+                mask=None) -> Obstacle:
+        if not self._free:
+            return Obstacle(row, column, rows_size, columns_size, uid, mask)
+        obstacle = self._free.pop()
+        obstacle.reset(row, column, rows_size, columns_size, uid, mask)
+        return obstacle
+
+    def release(self, obstacle: Obstacle):
+        obstacle.mask = None
+        self._free.append(obstacle)
+
+
 def _get_bounding_box_lines(rows, columns):
 
     yield ' ' + '-' * columns + ' '
@@ -56,7 +132,7 @@ async def show_obstacles(canvas, obstacles):
         for row, column, frame in boxes:
             draw_frame(canvas, row, column, frame)
 
-        await asyncio.sleep(0)
+        await sleep(1)
 
         for row, column, frame in boxes:
             draw_frame(canvas, row, column, frame, negative=True)
@@ -70,23 +146,200 @@ def _is_point_inside(corner_row, corner_column, size_rows, size_columns,
     return rows_flag and columns_flag
 
 
-def has_collision(obstacle_corner, obstacle_size, obj_corner, obj_size=(1, 1)):
-    """Determine if collision has occured. Return True or False."""
+def _has_box_collision(obstacle_row, obstacle_column, obstacle_rows,
+                       obstacle_columns, obj_row, obj_column, obj_rows,
+                       obj_columns):
+    """Same as has_collision, but takes scalars."""
 
-    opposite_obstacle_corner = (
-        obstacle_corner[0] + obstacle_size[0] - 1,
-        obstacle_corner[1] + obstacle_size[1] - 1,
+    return (
+        _is_point_inside(obstacle_row, obstacle_column, obstacle_rows,
+                         obstacle_columns, obj_row, obj_column) or
+        _is_point_inside(obstacle_row, obstacle_column, obstacle_rows,
+                         obstacle_columns, obj_row + obj_rows - 1,
+                         obj_column + obj_columns - 1) or
+        _is_point_inside(obj_row, obj_column, obj_rows, obj_columns,
+                         obstacle_row, obstacle_column) or
+        _is_point_inside(obj_row, obj_column, obj_rows, obj_columns,
+                         obstacle_row + obstacle_rows - 1,
+                         obstacle_column + obstacle_columns - 1)
     )
 
-    opposite_obj_corner = (
-        obj_corner[0] + obj_size[0] - 1,
-        obj_corner[1] + obj_size[1] - 1,
+
+def has_collision(obstacle_corner, obstacle_size, obj_corner, obj_size=(1, 1)):
+    """
+    Determine if collision has occured. Return True or False.
+    Boxes are checked at their current positions, see has_swept_collision
+    for moving ones.
+    """
+
+    return _has_box_collision(*obstacle_corner, *obstacle_size, *obj_corner,
+                              *obj_size)
+
+
+@lru_cache(maxsize=None)
+def get_box_mask(rows, columns):
+    """Return mask with all cells of the box occupied."""
+
+    return ((1 << columns) - 1,) * rows
+
+
+def has_mask_collision(obstacle_row, obstacle_column, obstacle_mask,
+                       obj_row, obj_column, obj_mask=(1,)):
+    """
+    Determine if occupied cells of obstacle and object overlap.
+    Positions are rounded same way as frames are drawn.
+    """
+
+    obstacle_row, obstacle_column = round(obstacle_row), round(obstacle_column)
+    obj_row, obj_column = round(obj_row), round(obj_column)
+
+    first_row = max(obstacle_row, obj_row)
+    last_row = min(obstacle_row + len(obstacle_mask),
+                   obj_row + len(obj_mask))
+    if first_row >= last_row:
+        return False
+
+    shift = obj_column - obstacle_column
+    for row in range(first_row, last_row):
+        obj_bits = obj_mask[row - obj_row]
+        if shift >= 0:
+            obj_bits <<= shift
+        else:
+            obj_bits >>= -shift
+        if obstacle_mask[row - obstacle_row] & obj_bits:
+            return True
+    return False
+
+
+def _get_axis_entry_time(obstacle_start, obstacle_size, obj_start,
+                         obj_size, move):
+    """
+    Return time, when object moving relative to obstacle starts to overlap
+    it by one axis: minus infinity if it overlaps without move, infinity
+    if it never does. Obstacle box is expanded by one cell to take into
+    account rounding of positions.
+    """
+
+    obstacle_end = obstacle_start + obstacle_size + 1
+    obstacle_start -= 1
+    if move > 0:
+        return (obstacle_start - obj_start - obj_size) / move
+    if move < 0:
+        return (obstacle_end - obj_start) / move
+    if obj_start < obstacle_end and obj_start + obj_size > obstacle_start:
+        return -math.inf
+    return math.inf
+
+
+def _get_axis_exit_time(obstacle_start, obstacle_size, obj_start,
+                        obj_size, move):
+    """Same as _get_axis_entry_time, but time when overlap is finished."""
+
+    if move > 0:
+        return (obstacle_start + obstacle_size + 1 - obj_start) / move
+    if move < 0:
+        return (obstacle_start - 1 - obj_start - obj_size) / move
+    return math.inf
+
+
+def _get_next_rounding_time(start, move, time):
+    """
+    Return time after the given one, when rounded position moving from
+    start changes, infinity if it does not move. Rounding changes when
+    position crosses the middle of a cell.
+    """
+
+    if not move:
+        return math.inf
+
+    position = start + move * time
+    if move > 0:
+        middle = math.floor(position - 0.5) + 1.5
+    else:
+        middle = math.ceil(position - 0.5) - 0.5
+    next_time = (middle - start) / move
+    if next_time <= time:
+        # position is on the middle already, but float error hides it
+        next_time += 1 / abs(move)
+    return next_time
+
+
+def _has_mask_collision_at(time, obstacle_row, obstacle_column,
+                           obstacle_mask, obstacle_row_move,
+                           obstacle_column_move, obj_row, obj_column,
+                           obj_mask, obj_row_move, obj_column_move):
+    return has_mask_collision(
+        obstacle_row + obstacle_row_move * time,
+        obstacle_column + obstacle_column_move * time,
+        obstacle_mask,
+        obj_row + obj_row_move * time,
+        obj_column + obj_column_move * time,
+        obj_mask)
+
+
+def has_swept_collision(obstacle_row, obstacle_column, obstacle_mask,
+                        obstacle_row_move, obstacle_column_move,
+                        obj_row, obj_column, obj_mask,
+                        obj_row_move, obj_column_move):
+    """
+    Determine if obstacle and object collide while both are moving from
+    start positions by their moves. Time interval of bounding boxes overlap
+    is found by swept AABB test. Inside the interval rounded positions
+    change only at separate moments, so occupied cells are checked at
+    every such moment and between them, fast objects can't tunnel through.
+    Called for every candidate obstacle, so nothing but numbers is created.
+    """
+
+    row_move = obj_row_move - obstacle_row_move
+    column_move = obj_column_move - obstacle_column_move
+    obstacle_rows, obj_rows = len(obstacle_mask), len(obj_mask)
+    obstacle_columns = max(obstacle_mask, default=0).bit_length()
+    obj_columns = max(obj_mask, default=0).bit_length()
+
+    start_time = max(
+        _get_axis_entry_time(obstacle_row, obstacle_rows, obj_row, obj_rows,
+                             row_move),
+        _get_axis_entry_time(obstacle_column, obstacle_columns, obj_column,
+                             obj_columns, column_move),
+        0,
+    )
+    end_time = min(
+        _get_axis_exit_time(obstacle_row, obstacle_rows, obj_row, obj_rows,
+                            row_move),
+        _get_axis_exit_time(obstacle_column, obstacle_columns, obj_column,
+                            obj_columns, column_move),
+        1,
     )
+    if start_time > end_time:
+        return False
+
+    time = start_time
+    while True:
+        next_time = min(
+            _get_next_rounding_time(obstacle_row, obstacle_row_move, time),
+            _get_next_rounding_time(obstacle_column, obstacle_column_move,
+                                    time),
+            _get_next_rounding_time(obj_row, obj_row_move, time),
+            _get_next_rounding_time(obj_column, obj_column_move, time),
+            end_time,
+        )
+        # the moment of change and the interval till the next one
+        if _has_mask_collision_at(
+                time, obstacle_row, obstacle_column, obstacle_mask,
+                obstacle_row_move, obstacle_column_move, obj_row,
+                obj_column, obj_mask, obj_row_move, obj_column_move):
+            return True
+        if _has_mask_collision_at(
+                (time + next_time) / 2, obstacle_row, obstacle_column,
+                obstacle_mask, obstacle_row_move, obstacle_column_move,
+                obj_row, obj_column, obj_mask, obj_row_move,
+                obj_column_move):
+            return True
+        if next_time >= end_time:
+            break
+        time = next_time
 
-    return any([
-        _is_point_inside(*obstacle_corner, *obstacle_size, *obj_corner),
-        _is_point_inside(*obstacle_corner, *obstacle_size,
-                         *opposite_obj_corner),
-        _is_point_inside(*obj_corner, *obj_size, *obstacle_corner),
-        _is_point_inside(*obj_corner, *obj_size, *opposite_obstacle_corner),
-    ])
+    return _has_mask_collision_at(
+        end_time, obstacle_row, obstacle_column, obstacle_mask,
+        obstacle_row_move, obstacle_column_move, obj_row, obj_column,
+        obj_mask, obj_row_move, obj_column_move)
@@ -1,4 +1,6 @@
 import math
+from functools import lru_cache
+from typing import MutableSequence, Optional, Sequence, Tuple
 
 
 def _limit(value, min_value, max_value):
@@ -78,3 +80,88 @@ def update_speed(row_speed, column_speed, rows_direction, columns_direction,
         column_speed = _apply_acceleration(column_speed, column_speed_limit,
                                            columns_direction > 0)
     return row_speed, column_speed
+
+
+# speeds reachable from rest by that number of ticks are cached on start
+PRECOMPUTED_TICKS = 8
+MAX_CACHED_SPEEDS = 2 ** 12
+
+
+class SpeedTable:
+    """
+    Speed changes of update_speed cached by exact speed value, so cosine
+    is not computed again for the speeds ship already had. Speeds reachable
+    from rest by holding any keys for precomputed_ticks are cached on start.
+    Least recently used speeds are evicted, when max_cached_speeds is
+    reached, so long sessions keep their current speeds cached.
+    Results are exactly the same as of update_speed.
+    """
+
+    def __init__(self, speed_limit=2, fading=0.8,
+                 precomputed_ticks=PRECOMPUTED_TICKS,
+                 max_cached_speeds=MAX_CACHED_SPEEDS):
+        if fading < 0 or fading > 1:
+            raise ValueError(f'Wrong fading value {fading}. '
+                             f'Expects float between 0 and 1.')
+
+        self.speed_limit = abs(speed_limit)
+        self.fading = fading
+        self.max_cached_speeds = max_cached_speeds
+        # faded speed -> speeds after acceleration backward and forward
+        self._get_accelerated = lru_cache(maxsize=max_cached_speeds)(
+            self._accelerate)
+
+        speeds = {0}
+        for _ in range(precomputed_ticks):
+            speeds = {self.update(speed, direction)
+                      for speed in speeds for direction in (-1, 0, 1)}
+
+    def __len__(self):
+        return self._get_accelerated.cache_info().currsize
+
+    def _accelerate(self, speed) -> Tuple[float, float]:
+        return (_apply_acceleration(speed, self.speed_limit, False),
+                _apply_acceleration(speed, self.speed_limit, True))
+
+    def update(self, speed, direction) -> float:
+        """Return speed after the tick, direction is -1, 0 or 1."""
+
+        speed *= self.fading
+        if not direction:
+            return speed
+
+        return self._get_accelerated(speed)[direction > 0]
+
+
+_default_speed_table: Optional[SpeedTable] = None
+
+
+def get_speed_table() -> SpeedTable:
+    """Return table for default limits and fading of update_speed."""
+
+    global _default_speed_table
+    if _default_speed_table is None:
+        _default_speed_table = SpeedTable()
+    return _default_speed_table
+
+
+def update_speeds(row_speeds: MutableSequence[float],
+                  column_speeds: MutableSequence[float],
+                  rows_directions: Sequence[int],
+                  columns_directions: Sequence[int],
+                  row_table: Optional[SpeedTable] = None,
+                  column_table: Optional[SpeedTable] = None):
+    """
+    Update speeds of many bodies in place in one call, e.g. arrays of
+    debris speeds. Same as update_speed called for every body.
+    """
+
+    row_table = row_table or get_speed_table()
+    column_table = column_table or row_table
+    update_row, update_column = row_table.update, column_table.update
+
+    for index, (rows_direction, columns_direction) in enumerate(
+            zip(rows_directions, columns_directions)):
+        row_speeds[index] = update_row(row_speeds[index], rows_direction)
+        column_speeds[index] = update_column(column_speeds[index],
+                                             columns_direction)
@@ -0,0 +1,114 @@
+import json
+from collections import defaultdict, deque
+from time import perf_counter
+from typing import Deque, Dict, NamedTuple
+
+
+ROLLING_WINDOW_TICKS = 100
+
+
+class TickStats(NamedTuple):
+    duration: float
+    kinds: Dict[str, float]
+    coroutines: int
+    obstacles: int
+    curses_calls: int
+
+
+class CountingCanvas:
+    """Curses window proxy counting calls of its methods."""
+
+    def __init__(self, canvas, profiler: 'TickProfiler'):
+        self._canvas = canvas
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        method = getattr(self._canvas, name)
+
+        def counted(*args, **kwargs):
+            self._profiler.curses_calls += 1
+            return method(*args, **kwargs)
+
+        return counted
+
+
+class TickProfiler:
+    """
+    Collect duration of ticks and time spent by every kind of coroutine —
+    coroutine function name. Keeps stats of the last ticks for the overlay
+    and totals for the whole session.
+    """
+
+    def __init__(self, window=ROLLING_WINDOW_TICKS):
+        self.ticks: Deque[TickStats] = deque(maxlen=window)
+        self.curses_calls = 0
+        self.total_ticks = 0
+        self.total_kinds: Dict[str, float] = defaultdict(float)
+        self.max_duration = 0.0
+
+        self._tick_start = 0.0
+        self._kinds: Dict[str, float] = defaultdict(float)
+
+    def wrap_canvas(self, canvas) -> CountingCanvas:
+        return CountingCanvas(canvas, self)
+
+    def start_tick(self):
+        self._tick_start = perf_counter()
+        self._kinds = defaultdict(float)
+        self.curses_calls = 0
+
+    def add_coroutine_time(self, kind: str, seconds: float):
+        self._kinds[kind] += seconds
+
+    def end_tick(self, coroutines: int, obstacles: int):
+        duration = perf_counter() - self._tick_start
+        self.ticks.append(TickStats(duration, self._kinds, coroutines,
+                                    obstacles, self.curses_calls))
+
+        self.total_ticks += 1
+        self.max_duration = max(self.max_duration, duration)
+        for kind, seconds in self._kinds.items():
+            self.total_kinds[kind] += seconds
+
+    def get_overlay_text(self) -> str:
+        if not self.ticks:
+            return ''
+
+        ticks_count = len(self.ticks)
+        kinds = defaultdict(float)
+        for stats in self.ticks:
+            for kind, seconds in stats.kinds.items():
+                kinds[kind] += seconds
+
+        last = self.ticks[-1]
+        duration = sum(stats.duration for stats in self.ticks) / ticks_count
+        parts = [f'tick {duration * 1000:.2f}ms']
+        parts += [
+            f'{kind.split(".")[-1]} {seconds / ticks_count * 1000:.2f}ms'
+            for kind, seconds in sorted(kinds.items(), key=lambda x: -x[1])
+        ]
+        parts.append(f'coroutines {last.coroutines} '
+                     f'obstacles {last.obstacles} '
+                     f'curses calls {last.curses_calls}')
+        return ' | '.join(parts)
+
+    def draw_overlay(self, canvas):
+        rows, columns = canvas.getmaxyx()
+        text = self.get_overlay_text()[:columns - 2]
+        canvas.addstr(rows - 2, 1, text.ljust(columns - 2))
+
+    def summary(self) -> dict:
+        total_ticks = self.total_ticks or 1
+        return {
+            'ticks': self.total_ticks,
+            'max_tick_ms': self.max_duration * 1000,
+            'coroutine_ms_per_tick': {
+                kind: seconds / total_ticks * 1000
+                for kind, seconds in self.total_kinds.items()
+            },
+            'last_ticks': [stats._asdict() for stats in self.ticks],
+        }
+
+    def dump(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
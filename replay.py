@@ -0,0 +1,201 @@
+"""
+Replay of recorded game session without terminal at unlimited speed:
+    python3 replay.py session.rec
+
+Session is recorded by main.py --record session.rec, session recorded
+with custom timeline is replayed with the same --timeline option.
+"""
+import argparse
+import random
+import struct
+import zlib
+from array import array
+from typing import BinaryIO, Optional, Tuple
+
+from game import MyGame
+from headless import run_headless
+from profiler import TickProfiler
+from timeline import TIMELINE_FILE, Timeline
+
+
+MAGIC = b'SGRP'
+VERSION = 3
+HEADER = struct.Struct('<4sHIHHI')
+
+Controls = Tuple[int, int, bool]
+
+
+PAUSE_BIT = 1 << 5
+# terminal is resized during the tick, its new size follows the byte
+RESIZE_BIT = 1 << 6
+RESIZE = struct.Struct('<HH')
+
+
+def pack_controls(rows_direction: int, columns_direction: int,
+                  space_pressed: bool) -> int:
+    """Pack controls state of the tick to one byte."""
+
+    return ((rows_direction + 1) | (columns_direction + 1) << 2 |
+            bool(space_pressed) << 4)
+
+
+def unpack_controls(value: int) -> Controls:
+    return (value & 0b11) - 1, (value >> 2 & 0b11) - 1, bool(value >> 4 & 1)
+
+
+def get_timeline_checksum(path=TIMELINE_FILE) -> int:
+    """Return checksum of timeline config to check replay uses the same."""
+
+    with open(path, 'rb') as f:
+        return zlib.crc32(f.read())
+
+
+def new_seed() -> int:
+    """Seed random with new value and return it."""
+
+    seed = random.randrange(2 ** 32)
+    random.seed(seed)
+    return seed
+
+
+class Recorder:
+    """
+    Controls reader writing controls state of every tick to the file.
+    Wraps another controls reader, e.g. curses_tools.read_controls.
+    Terminal resizes are recorded with the new size, as resize changes
+    the game, e.g. generates new stars.
+    """
+
+    def __init__(self, reader, output: BinaryIO, seed: int,
+                 timeline_checksum=0):
+        self.reader = reader
+        self.output = output
+        self.seed = seed
+        self.timeline_checksum = timeline_checksum
+        self.ticks = 0
+
+    def __call__(self, canvas, on_resize=None, on_pause=None) -> Controls:
+        if not self.ticks:
+            rows, columns = canvas.getmaxyx()
+            self.output.write(HEADER.pack(MAGIC, VERSION, self.seed, rows,
+                                          columns, self.timeline_checksum))
+
+        pauses = []
+        sizes = []
+
+        def resize():
+            sizes.append(canvas.getmaxyx())
+            if on_resize is not None:
+                on_resize()
+
+        controls = self.reader(canvas, resize,
+                               lambda: pauses.append(PAUSE_BIT))
+        value = pack_controls(*controls)
+        for pause in pauses:
+            # pressed twice during the tick means no pause
+            value ^= pause
+            if on_pause is not None:
+                on_pause()
+        if sizes:
+            # game is fit to the last size of the tick
+            self.output.write(bytes((value | RESIZE_BIT,)) +
+                              RESIZE.pack(*sizes[-1]))
+        else:
+            self.output.write(bytes((value,)))
+        self.ticks += 1
+        return controls
+
+
+class Replayer:
+    """
+    Controls reader returning controls state recorded to the file.
+    Recorded resizes are applied to the canvas, e.g. headless one.
+    """
+
+    def __init__(self, data: bytes):
+        (magic, version, self.seed, self.rows, self.columns,
+         self.timeline_checksum) = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('Wrong file format of recorded session.')
+
+        self._data = memoryview(data)
+        # offsets of ticks, which take more than a byte if resized
+        self._offsets = array('L')
+        offset = HEADER.size
+        while offset < len(data):
+            self._offsets.append(offset)
+            offset += 1
+            if data[offset - 1] & RESIZE_BIT:
+                offset += RESIZE.size
+        if offset != len(data):
+            raise ValueError('Recorded session is truncated.')
+        self._position = 0
+
+    def __len__(self):
+        return len(self._offsets)
+
+    @property
+    def finished(self) -> bool:
+        return self._position >= len(self._offsets)
+
+    def __call__(self, canvas, on_resize=None, on_pause=None) -> Controls:
+        if self.finished:
+            return 0, 0, False
+        offset = self._offsets[self._position]
+        value = self._data[offset]
+        self._position += 1
+        if value & RESIZE_BIT:
+            canvas.resize(*RESIZE.unpack_from(self._data, offset + 1))
+            if on_resize is not None:
+                on_resize()
+        if value & PAUSE_BIT and on_pause is not None:
+            on_pause()
+        return unpack_controls(value)
+
+
+def replay(data: bytes, game: Optional[MyGame] = None,
+           timeline_file=TIMELINE_FILE):
+    """
+    Replay recorded session without terminal, return HeadlessResult.
+    Timeline should be the same, as the session is recorded with.
+    """
+
+    replayer = Replayer(data)
+    if get_timeline_checksum(timeline_file) != replayer.timeline_checksum:
+        raise ValueError('Session is recorded with another timeline.')
+    game = game or MyGame()
+    game.timeline = Timeline.load(timeline_file)
+    game.controls_reader = replayer
+    return run_headless(len(replayer), replayer.rows, replayer.columns,
+                        seed=replayer.seed, game=game)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded session')
+    parser.add_argument('file', type=argparse.FileType('rb'))
+    parser.add_argument('--dump', action='store_true',
+                        help='print the last frame')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='dump tick stats to file')
+    parser.add_argument('--timeline', metavar='FILE', default=TIMELINE_FILE,
+                        help='config of game years the session is '
+                             'recorded with')
+    args = parser.parse_args()
+
+    game = MyGame()
+    if args.profile:
+        game.profiler = TickProfiler()
+
+    result = replay(args.file.read(), game, args.timeline)
+    if args.profile:
+        game.profiler.dump(args.profile)
+
+    if args.dump:
+        print(result.canvas.dump())
+    print(f'ticks: {result.ticks}, seconds: {result.seconds:.3f}, '
+          f'ticks per second: {result.ticks_per_second:.1f}, '
+          f'year: {result.game.current_year}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Coroutine, Dict, List, Optional, Tuple
+
+
+WHEEL_SIZE = 64
+
+# tick clock of the game run on asyncio loop, see asyncio_clock.TickClock
+current_clock: ContextVar = ContextVar('current_clock', default=None)
+
+
+class Sleep:
+    """
+    Awaitable asking scheduler to resume coroutine after ticks passed.
+    On asyncio loop it waits for the frame of the current tick clock.
+    """
+
+    __slots__ = ('ticks',)
+
+    def __init__(self, ticks=1):
+        self.ticks = ticks
+
+    def __await__(self):
+        clock = current_clock.get()
+        if clock is None:
+            yield self
+        else:
+            yield from clock.next_frame(self.ticks).__await__()
+
+
+async def sleep(ticks=1):
+    """Suspend coroutine for the number of ticks, zero ticks means no pause."""
+
+    if ticks > 0:
+        await Sleep(ticks)
+
+
+class Scheduler:
+    """
+    Round-robin of coroutines driven by ticks. Sleeping coroutines are kept
+    in a timer wheel — list of buckets indexed by tick number modulo wheel
+    size, so every tick only the coroutines due at that tick are resumed.
+
+    Coroutine is resumed on the next tick when it yields None
+    (e.g. asyncio.sleep(0)) and after N ticks when it awaits Sleep(N).
+
+    Coroutines may be spawned in named groups to cancel them together.
+
+    If profiler is set, time of every resume is reported to it.
+    """
+
+    def __init__(self, wheel_size=WHEEL_SIZE):
+        self.tick = 0
+        self.profiler = None
+        self._wheel: List[List[Tuple[int, Coroutine]]] = [
+            [] for _ in range(wheel_size)
+        ]
+        # coroutine -> its group
+        self._coroutines: Dict[Coroutine, Optional[str]] = dict()
+        self._running: Optional[Coroutine] = None
+
+    def __len__(self):
+        return len(self._coroutines)
+
+    def _schedule(self, coroutine, due_tick):
+        self._wheel[due_tick % len(self._wheel)].append((due_tick, coroutine))
+
+    def spawn(self, coroutine, delay=0, group: Optional[str] = None):
+        """
+        Add coroutine to scheduler. Coroutines spawned while the tick is
+        processed start on the next tick.
+        """
+
+        start_tick = self.tick if self._running is None else self.tick + 1
+        self._schedule(coroutine, start_tick + delay)
+        self._coroutines[coroutine] = group
+
+    def cancel_group(self, group: str):
+        """
+        Close all coroutines of the group. Coroutine running at the moment
+        is only removed from the scheduler, it is not resumed anymore.
+        """
+
+        cancelled = [coroutine
+                     for coroutine, coroutine_group in self._coroutines.items()
+                     if coroutine_group == group]
+        for coroutine in cancelled:
+            del self._coroutines[coroutine]
+            if coroutine is not self._running:
+                coroutine.close()
+
+    def run_tick(self):
+        """Resume every coroutine due at the current tick."""
+
+        wheel_size = len(self._wheel)
+        bucket_index = self.tick % wheel_size
+        bucket = self._wheel[bucket_index]
+        self._wheel[bucket_index] = []
+
+        profiler = self.profiler
+        coroutines = self._coroutines
+
+        try:
+            for due_tick, coroutine in bucket:
+                if coroutine not in coroutines:
+                    continue
+                if due_tick > self.tick:
+                    self._wheel[bucket_index].append((due_tick, coroutine))
+                    continue
+
+                if profiler is not None:
+                    resume_start = perf_counter()
+                self._running = coroutine
+                try:
+                    request = coroutine.send(None)
+                except StopIteration:
+                    coroutines.pop(coroutine, None)
+                    continue
+                finally:
+                    if profiler is not None:
+                        profiler.add_coroutine_time(
+                            coroutine.__qualname__,
+                            perf_counter() - resume_start)
+
+                if coroutine in coroutines:
+                    ticks = request.ticks if isinstance(request, Sleep) else 1
+                    self._schedule(coroutine, self.tick + max(ticks, 1))
+                else:
+                    coroutine.close()
+        finally:
+            self._running = None
+
+        self.tick += 1
@@ -1,29 +1,26 @@
-import asyncio
-from typing import NamedTuple
+from array import array
+from typing import (Callable, Dict, List, NamedTuple, Optional, Sequence,
+                    Set, Tuple)
 from random import random
 
+from assets import get_sprite
 from curses_tools import draw_frame
-from obstacles import Obstacle
-from explosion import explode
+from obstacles import ObstaclePool
+from spatial_grid import SpatialGrid
+from scheduler import sleep
+from sprite import Sprite
+from viewport import Viewport
 
 
 class TrashFrame(NamedTuple):
-    frame: str
+    frame: Sprite
     width: int
     height: int
 
 
 def load_frame(filename: str):
-    width, height = 0, 0
-    with open(filename, 'r') as f:
-        result = []
-        for line in f:
-            line = line.rstrip()
-            result.append(line)
-            height += 1
-            width = max(width, len(line))
-    result = '\n'.join(result)
-    return TrashFrame(result, width, height)
+    sprite = get_sprite(filename)
+    return TrashFrame(sprite, sprite.columns, sprite.rows)
 
 
 TRASH_FRAMES_FILES = ('trashFrames/duck.txt', 'trashFrames/hubble.txt',
@@ -31,40 +28,125 @@ TRASH_FRAMES_FILES = ('trashFrames/duck.txt', 'trashFrames/hubble.txt',
                       'trashFrames/trash_small.txt',
                       'trashFrames/trash_xl.txt')
 
-TRASH_FRAMES = [load_frame(x) for x in TRASH_FRAMES_FILES]
+_trash_frames: List[TrashFrame] = []
 
 
-async def fly_garbage(canvas, column: int, garbage_frame: TrashFrame,
-                      obstacle_id: int, obstacles: dict,
-                      destoyed_obstacle_ids: set):
-    """
-    Animate garbage, flying from top to bottom.
-    Сolumn position will stay same, as specified on start.
-    """
-    rows_number, columns_number = canvas.getmaxyx()
-
-    corrected_column = column - garbage_frame.width - 1
-    column = min(max(1, corrected_column), column)
+def get_trash_frames() -> List[TrashFrame]:
+    if not _trash_frames:
+        _trash_frames.extend(load_frame(x) for x in TRASH_FRAMES_FILES)
+    return _trash_frames
 
-    obstacles[obstacle_id] = Obstacle(0, column, garbage_frame.height,
-                                      garbage_frame.width)
 
-    speed = 0.01 + random()
+NEW, FLYING = 0, 1
 
-    row = 0
-    while row < rows_number:
-        draw_frame(canvas, row, column, garbage_frame.frame)
-        await asyncio.sleep(0)
-        draw_frame(canvas, row, column, garbage_frame.frame, negative=True)
 
-        if obstacle_id in destoyed_obstacle_ids:
-            destoyed_obstacle_ids.remove(obstacle_id)
-            center_row = row + int(garbage_frame.height / 2)
-            center_col = column + int(garbage_frame.width / 2)
-            await explode(canvas, center_row, center_col)
-            break
-
-        row += speed
-        obstacles[obstacle_id].row = row
+class GarbageField:
+    """
+    All garbage, flying from top to bottom, kept in parallel arrays.
+    Every tick the whole field is moved by one pass: garbage is erased,
+    destroyed or moved and drawn at the new row, finished entries are
+    compacted out of the arrays in the same pass.
+    Column position of garbage stays same, as specified on start.
+    """
 
-    del obstacles[obstacle_id]
+    def __init__(self, canvas, viewport: Viewport, obstacles: SpatialGrid,
+                 destroyed_obstacle_ids: Set[int],
+                 on_destroyed: Callable[[float, float], None],
+                 frames: Optional[Sequence[TrashFrame]] = None):
+        self.canvas = canvas
+        self.viewport = viewport
+        self.obstacles = obstacles
+        self.destroyed_obstacle_ids = destroyed_obstacle_ids
+        self.on_destroyed = on_destroyed
+        self.frames = frames or get_trash_frames()
+        self.obstacle_pool = ObstaclePool()
+
+        self.ids = array('l')
+        self.rows = array('d')
+        self.columns = array('l')
+        self.speeds = array('d')
+        self.frame_indexes = array('B')
+        self.states = array('B')
+
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, column: int, frame_index: int) -> int:
+        """Launch garbage from the top row. Return its obstacle id."""
+
+        frame = self.frames[frame_index]
+        corrected_column = column - frame.width - 1
+        column = min(max(1, corrected_column), column)
+
+        obstacle_id = self._next_id
+        self._next_id += 1
+        self.obstacles[obstacle_id] = self.obstacle_pool.acquire(
+            0, column, frame.height, frame.width, mask=frame.frame.mask)
+
+        self.ids.append(obstacle_id)
+        self.rows.append(0)
+        self.columns.append(column)
+        self.speeds.append(0.01 + random())
+        self.frame_indexes.append(frame_index)
+        self.states.append(NEW)
+        return obstacle_id
+
+    def get_positions(self) -> Dict[int, Tuple[int, int, int]]:
+        """Return row, column and frame index of garbage by obstacle ids."""
+
+        return {
+            obstacle_id: (round(row), column, frame_index)
+            for obstacle_id, row, column, frame_index in zip(
+                self.ids, self.rows, self.columns, self.frame_indexes)
+        }
+
+    def step(self):
+        canvas, obstacles = self.canvas, self.obstacles
+        obstacle_pool = self.obstacle_pool
+        destroyed_obstacle_ids = self.destroyed_obstacle_ids
+        ids, rows, columns = self.ids, self.rows, self.columns
+        speeds, frame_indexes, states = (self.speeds, self.frame_indexes,
+                                         self.states)
+        rows_number = self.viewport.rows
+
+        alive_count = 0
+        for index in range(len(ids)):
+            obstacle_id, row, column = ids[index], rows[index], columns[index]
+            frame = self.frames[frame_indexes[index]]
+
+            if states[index] == FLYING:
+                draw_frame(canvas, row, column, frame.frame, negative=True)
+
+                if obstacle_id in destroyed_obstacle_ids:
+                    destroyed_obstacle_ids.remove(obstacle_id)
+                    obstacle_pool.release(obstacles.pop(obstacle_id))
+                    self.on_destroyed(row + int(frame.height / 2),
+                                      column + int(frame.width / 2))
+                    continue
+
+                row += speeds[index]
+                if row >= rows_number:
+                    obstacle_pool.release(obstacles.pop(obstacle_id))
+                    continue
+                obstacles.move(obstacle_id, row)
+
+            draw_frame(canvas, row, column, frame.frame)
+
+            if alive_count != index:
+                ids[alive_count] = obstacle_id
+                columns[alive_count] = column
+                speeds[alive_count] = speeds[index]
+                frame_indexes[alive_count] = frame_indexes[index]
+            rows[alive_count] = row
+            states[alive_count] = FLYING
+            alive_count += 1
+
+        for values in (ids, rows, columns, speeds, frame_indexes, states):
+            del values[alive_count:]
+
+    async def animate(self):
+        while True:
+            self.step()
+            await sleep(1)
@@ -0,0 +1,142 @@
+from collections import defaultdict
+from math import floor
+from typing import Dict, Set, Tuple
+
+from obstacles import Obstacle
+
+
+CELL_ROWS = 8
+CELL_COLUMNS = 8
+# obstacles move slower, than by the number of cells per tick
+MAX_OBSTACLE_MOVE = 2
+
+
+class SpatialGrid:
+    """
+    Uniform grid index of obstacles. Behaves like a dict of obstacles keyed
+    by id, additionally every obstacle is registered in all grid cells its
+    bounding box overlaps, so collision queries only look at obstacles
+    located near the queried box.
+    """
+
+    def __init__(self, cell_rows=CELL_ROWS, cell_columns=CELL_COLUMNS):
+        self.cell_rows = cell_rows
+        self.cell_columns = cell_columns
+        self._obstacles: Dict[int, Obstacle] = dict()
+        self._spans: Dict[int, Tuple[int, int, int, int]] = dict()
+        self._cells: Dict[Tuple[int, int], Set[int]] = defaultdict(set)
+
+    def __len__(self):
+        return len(self._obstacles)
+
+    def __iter__(self):
+        return iter(self._obstacles)
+
+    def __contains__(self, uid):
+        return uid in self._obstacles
+
+    def __getitem__(self, uid) -> Obstacle:
+        return self._obstacles[uid]
+
+    def __setitem__(self, uid, obstacle: Obstacle):
+        if uid in self._obstacles:
+            self._unlink(uid)
+        self._obstacles[uid] = obstacle
+        self._link(uid)
+
+    def __delitem__(self, uid):
+        self._unlink(uid)
+        del self._obstacles[uid]
+
+    def pop(self, uid) -> Obstacle:
+        self._unlink(uid)
+        return self._obstacles.pop(uid)
+
+    def items(self):
+        return self._obstacles.items()
+
+    def values(self):
+        return self._obstacles.values()
+
+    def _get_span(self, row, column, rows_size, columns_size):
+        return (
+            floor(row / self.cell_rows),
+            floor((row + rows_size) / self.cell_rows),
+            floor(column / self.cell_columns),
+            floor((column + columns_size) / self.cell_columns),
+        )
+
+    def _link(self, uid):
+        obstacle = self._obstacles[uid]
+        span = self._get_span(obstacle.row, obstacle.column,
+                              obstacle.rows_size, obstacle.columns_size)
+        first_row, last_row, first_column, last_column = span
+        for cell_row in range(first_row, last_row + 1):
+            for cell_column in range(first_column, last_column + 1):
+                self._cells[(cell_row, cell_column)].add(uid)
+        self._spans[uid] = span
+
+    def _unlink(self, uid):
+        first_row, last_row, first_column, last_column = self._spans.pop(uid)
+        for cell_row in range(first_row, last_row + 1):
+            for cell_column in range(first_column, last_column + 1):
+                cell = self._cells[(cell_row, cell_column)]
+                cell.discard(uid)
+                if not cell:
+                    del self._cells[(cell_row, cell_column)]
+
+    def move(self, uid, row, column=None):
+        """Move obstacle to new position, relink it only if cells changed."""
+
+        obstacle = self._obstacles[uid]
+        obstacle.previous_row = obstacle.row
+        obstacle.previous_column = obstacle.column
+        obstacle.row = row
+        if column is not None:
+            obstacle.column = column
+
+        span = self._get_span(obstacle.row, obstacle.column,
+                              obstacle.rows_size, obstacle.columns_size)
+        if span != self._spans[uid]:
+            self._unlink(uid)
+            self._link(uid)
+
+    def find_swept_collision(self, row, column, row_move, column_move,
+                             rows_size=1, columns_size=1, mask=None):
+        """
+        Return id of the first obstacle colliding with box moving from
+        the position by the move during the last tick or None.
+        It is called for every bullet each tick, so nothing but numbers is
+        created: obstacle overlapping several cells is checked only in
+        the first of them, no set of seen obstacles is needed.
+        """
+
+        margin = MAX_OBSTACLE_MOVE
+        first_row = min(row, row + row_move) - margin
+        first_column = min(column, column + column_move) - margin
+        first_cell_row = floor(first_row / self.cell_rows)
+        last_cell_row = floor(
+            (first_row + rows_size + abs(row_move) + 2 * margin) /
+            self.cell_rows)
+        first_cell_column = floor(first_column / self.cell_columns)
+        last_cell_column = floor(
+            (first_column + columns_size + abs(column_move) + 2 * margin) /
+            self.cell_columns)
+
+        cells, spans, obstacles = self._cells, self._spans, self._obstacles
+        for cell_row in range(first_cell_row, last_cell_row + 1):
+            for cell_column in range(first_cell_column, last_cell_column + 1):
+                cell = cells.get((cell_row, cell_column))
+                if not cell:
+                    continue
+                for uid in cell:
+                    obstacle_row, _, obstacle_column, _ = spans[uid]
+                    if (cell_row != max(obstacle_row, first_cell_row) or
+                            cell_column != max(obstacle_column,
+                                               first_cell_column)):
+                        continue
+                    if obstacles[uid].has_swept_collision(
+                            row, column, row_move, column_move, rows_size,
+                            columns_size, mask):
+                        return uid
+        return None
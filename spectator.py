@@ -0,0 +1,394 @@
+"""
+Watch the game from another terminal:
+    python3 spectator.py /tmp/space.sock
+
+Game publishes its state to the socket, if started by
+main.py --publish /tmp/space.sock
+"""
+import argparse
+import curses
+import os
+import selectors
+import socket
+import stat
+import struct
+from typing import (Callable, Dict, Iterator, List, NamedTuple, Optional,
+                    Tuple)
+
+from curses_tools import draw_frame
+from frame_buffer import FrameBuffer
+from game import BORDER_SIZE, load_game_over_frame, load_space_frames
+from lifecycle import PAUSED
+from space_garbage import get_trash_frames
+
+
+KEYFRAME, DELTA = 0, 1
+DEAD_FLAG, PAUSED_FLAG = 1, 2
+
+LENGTH = struct.Struct('<I')
+STATE_HEADER = struct.Struct('<BIHBhh')
+COUNT = struct.Struct('<H')
+
+# bytes not sent to spectator yet, when it is disconnected as too slow
+MAX_BACKLOG = 1 << 16
+RECEIVE_SIZE = 1 << 16
+
+Records = Dict[int, Tuple[int, ...]]
+
+
+class GameState(NamedTuple):
+    tick: int
+    year: int
+    flags: int
+    ship_row: int
+    ship_column: int
+    # obstacle id: row, column, trash frame index
+    garbage: Records
+    # bullet slot: row, column
+    bullets: Records
+
+
+def collect_state(game) -> GameState:
+    """Take state of the game tick, positions are rounded as drawn."""
+
+    flags = 0
+    if game.is_space_died:
+        flags |= DEAD_FLAG
+    if game.lifecycle.state == PAUSED:
+        flags |= PAUSED_FLAG
+    column, row = game.space_coords
+    return GameState(game.tick_number, game.current_year, flags, round(row),
+                     round(column), game.garbage_field.get_positions(),
+                     game.bullets.get_positions())
+
+
+class RecordsCodec:
+    """
+    Delta encoding of records kept in order of addition, like garbage of
+    GarbageField. Delta lists keys of removed records, changes of moving
+    values of the rest in the same order and new records with all values.
+    """
+
+    def __init__(self, key_format: str, moving_count: int,
+                 static_format: str = ''):
+        self.moving_count = moving_count
+        self.key = struct.Struct('<' + key_format)
+        self.change = struct.Struct('<' + 'b' * moving_count)
+        self.record = struct.Struct(
+            '<' + key_format + 'h' * moving_count + static_format)
+
+    def encode(self, previous: Records, current: Records) -> Optional[bytes]:
+        """Return delta, None if records are changed too much for it."""
+
+        removed = [key for key in previous if key not in current]
+        kept = [key for key in current if key in previous]
+        if kept != [key for key in previous if key in current]:
+            return None
+
+        changes = []
+        for key in kept:
+            old, new = previous[key], current[key]
+            if old[self.moving_count:] != new[self.moving_count:]:
+                return None
+            change = [new[i] - old[i] for i in range(self.moving_count)]
+            if not all(-128 <= value < 128 for value in change):
+                return None
+            changes.append(self.change.pack(*change))
+
+        added = [self.record.pack(key, *values)
+                 for key, values in current.items() if key not in previous]
+
+        return b''.join([
+            COUNT.pack(len(removed)),
+            *(self.key.pack(key) for key in removed),
+            COUNT.pack(len(changes)), *changes,
+            COUNT.pack(len(added)), *added,
+        ])
+
+    def decode(self, records: Records, data: bytes, offset: int) -> int:
+        """Apply delta to records in place, return offset after it."""
+
+        count, = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        for _ in range(count):
+            key, = self.key.unpack_from(data, offset)
+            offset += self.key.size
+            del records[key]
+
+        count, = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        if count != len(records):
+            raise ValueError('Delta does not match spectator state.')
+        for key, values in records.items():
+            change = self.change.unpack_from(data, offset)
+            offset += self.change.size
+            records[key] = tuple(
+                value + change[i] if i < self.moving_count else value
+                for i, value in enumerate(values))
+
+        count, = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        for _ in range(count):
+            key, *values = self.record.unpack_from(data, offset)
+            offset += self.record.size
+            records[key] = tuple(values)
+        return offset
+
+
+# garbage moves only by rows, bullets by both axes
+GARBAGE_CODEC = RecordsCodec('I', 1, 'hB')
+BULLETS_CODEC = RecordsCodec('H', 2)
+
+
+def encode_frame(state: GameState,
+                 previous: Optional[GameState] = None) -> bytes:
+    """
+    Encode state as delta from the previous one, or as keyframe if there
+    is no previous state or delta can't be made. Frame is prefixed with
+    its length.
+    """
+
+    sections = None
+    if previous is not None:
+        garbage = GARBAGE_CODEC.encode(previous.garbage, state.garbage)
+        bullets = BULLETS_CODEC.encode(previous.bullets, state.bullets)
+        if garbage is not None and bullets is not None:
+            kind, sections = DELTA, garbage + bullets
+    if sections is None:
+        kind = KEYFRAME
+        sections = (GARBAGE_CODEC.encode({}, state.garbage) +
+                    BULLETS_CODEC.encode({}, state.bullets))
+
+    body = STATE_HEADER.pack(kind, state.tick, state.year, state.flags,
+                             state.ship_row, state.ship_column) + sections
+    return LENGTH.pack(len(body)) + body
+
+
+def decode_frame(body: bytes, previous: Optional[GameState]) -> GameState:
+    """Decode frame body without length prefix, see encode_frame."""
+
+    kind, tick, year, flags, ship_row, ship_column = (
+        STATE_HEADER.unpack_from(body))
+    if kind == KEYFRAME:
+        garbage, bullets = {}, {}
+    elif previous is None:
+        raise ValueError('Delta frame is received before keyframe.')
+    else:
+        garbage, bullets = dict(previous.garbage), dict(previous.bullets)
+
+    offset = GARBAGE_CODEC.decode(garbage, body, STATE_HEADER.size)
+    BULLETS_CODEC.decode(bullets, body, offset)
+    return GameState(tick, year, flags, ship_row, ship_column, garbage,
+                     bullets)
+
+
+class StatePublisher:
+    """
+    Unix socket server sending game state to spectators every tick.
+    State is encoded once per tick and the same delta is sent to all
+    spectators, just connected ones get keyframe first. Sockets are never
+    blocked: frames not sent yet are buffered, spectator is disconnected
+    if it falls too far behind.
+    """
+
+    def __init__(self, path: str, max_backlog=MAX_BACKLOG):
+        self.path = path
+        self.max_backlog = max_backlog
+        # socket left by the crashed game
+        if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(path)
+        self._server.listen()
+        self._server.setblocking(False)
+
+        self._spectators: Dict[socket.socket, bytearray] = dict()
+        self._previous: Optional[GameState] = None
+
+    def __len__(self):
+        return len(self._spectators)
+
+    def close(self):
+        for spectator in self._spectators:
+            spectator.close()
+        self._spectators.clear()
+        self._server.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def _accept(self) -> List[socket.socket]:
+        new_spectators = []
+        while True:
+            try:
+                spectator, _ = self._server.accept()
+            except BlockingIOError:
+                return new_spectators
+            spectator.setblocking(False)
+            new_spectators.append(spectator)
+
+    def publish(self, game):
+        new_spectators = self._accept()
+        if not self._spectators and not new_spectators:
+            self._previous = None
+            return
+
+        state = collect_state(game)
+        if self._spectators:
+            frame = encode_frame(state, self._previous)
+            for spectator in list(self._spectators):
+                self._send(spectator, frame)
+        if new_spectators:
+            keyframe = encode_frame(state)
+            for spectator in new_spectators:
+                self._spectators[spectator] = bytearray()
+                self._send(spectator, keyframe)
+        self._previous = state
+
+    def _send(self, spectator: socket.socket, frame: bytes):
+        backlog = self._spectators[spectator]
+        backlog += frame
+        try:
+            sent = spectator.send(backlog)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self._disconnect(spectator)
+            return
+        del backlog[:sent]
+        if len(backlog) > self.max_backlog:
+            self._disconnect(spectator)
+
+    def _disconnect(self, spectator: socket.socket):
+        del self._spectators[spectator]
+        spectator.close()
+
+
+class SpectatorClient:
+    """Connection to the game, decodes frames to game states."""
+
+    def __init__(self, path: str):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(path)
+        self.state: Optional[GameState] = None
+        self.is_closed = False
+        self._data = bytearray()
+
+    def close(self):
+        self.socket.close()
+
+    def fileno(self) -> int:
+        return self.socket.fileno()
+
+    def receive(self) -> List[GameState]:
+        """
+        Read data arrived to the socket, block if there is nothing.
+        Return states of the complete frames received.
+        """
+
+        data = self.socket.recv(RECEIVE_SIZE)
+        if not data:
+            self.is_closed = True
+            return []
+        self._data += data
+
+        states = []
+        offset = 0
+        while len(self._data) - offset >= LENGTH.size:
+            length, = LENGTH.unpack_from(self._data, offset)
+            end = offset + LENGTH.size + length
+            if end > len(self._data):
+                break
+            body = bytes(self._data[offset + LENGTH.size:end])
+            self.state = decode_frame(body, self.state)
+            states.append(self.state)
+            offset = end
+        del self._data[:offset]
+        return states
+
+    def __iter__(self) -> Iterator[GameState]:
+        while not self.is_closed:
+            yield from self.receive()
+
+
+class SpectatorView:
+    """Draws game states received by spectator on the screen."""
+
+    def __init__(self, screen):
+        self.screen = screen
+        rows, columns = screen.getmaxyx()
+        self.canvas = FrameBuffer(rows, columns)
+        self.space_frames = load_space_frames()
+        self.trash_frames = get_trash_frames()
+        self.game_over_frame = load_game_over_frame()
+        self._erasers: List[Callable[[], None]] = []
+
+    def resize(self):
+        rows, columns = self.screen.getmaxyx()
+        self.canvas.border(erase=True)
+        self.canvas.resize(rows, columns)
+
+    def _draw(self, row, column, frame):
+        draw_frame(self.canvas, row, column, frame)
+        self._erasers.append(
+            lambda: draw_frame(self.canvas, row, column, frame, negative=True))
+
+    def draw(self, state: GameState):
+        for erase in self._erasers:
+            erase()
+        self._erasers = []
+
+        for row, column, frame_index in state.garbage.values():
+            self._draw(row, column, self.trash_frames[frame_index].frame)
+        for row, column in state.bullets.values():
+            self._draw(row, column, '|')
+        if not state.flags & DEAD_FLAG:
+            frame = self.space_frames[state.tick % len(self.space_frames)]
+            self._draw(state.ship_row, state.ship_column, frame)
+
+        rows, columns = self.canvas.getmaxyx()
+        label = f'Year: {state.year}'
+        if state.flags & PAUSED_FLAG:
+            label += ' (paused)'
+        self._draw(BORDER_SIZE, BORDER_SIZE, label)
+        if state.flags & DEAD_FLAG:
+            self._draw((rows - self.game_over_frame.rows) / 2,
+                       (columns - self.game_over_frame.columns) / 2,
+                       self.game_over_frame)
+
+        self.canvas.border()
+        self.canvas.flush(self.screen)
+        self.screen.refresh()
+
+
+def watch(screen, client: SpectatorClient):
+    curses.curs_set(False)
+    screen.nodelay(True)
+    view = SpectatorView(screen)
+
+    selector = selectors.DefaultSelector()
+    selector.register(client, selectors.EVENT_READ)
+    while True:
+        selector.select()
+        states = client.receive()
+        if client.is_closed:
+            return
+        if screen.getch() == curses.KEY_RESIZE:
+            view.resize()
+        if states:
+            view.draw(states[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Watch the game')
+    parser.add_argument('socket', help='socket the game is published to')
+    args = parser.parse_args()
+
+    client = SpectatorClient(args.socket)
+    try:
+        curses.wrapper(watch, client)
+    finally:
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
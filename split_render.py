@@ -0,0 +1,287 @@
+"""
+Game simulated in a worker process, rendered by the main one.
+
+Worker draws frames to the shared memory double buffer: while renderer
+copies the last published frame, worker writes the next one to the other
+slot. Keys are passed to worker by the queue.
+"""
+import curses
+import multiprocessing
+import queue
+import time
+from array import array
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+from curses_tools import read_controls
+from frame_buffer import FrameBuffer
+from game import ANIMATION_DELAY, MyGame
+from timeline import TIMELINE_FILE, Timeline
+
+
+MAX_ROWS = 300
+MAX_COLUMNS = 1000
+RENDER_INTERVAL = ANIMATION_DELAY / 4
+
+# header cells: number of the last published frame, its slot and sizes of
+# frames in both slots
+FRAME_NUMBER, PUBLISHED_SLOT, SLOT_SIZES = 0, 1, 2
+HEADER_SIZE = 6
+
+
+class SharedFrames:
+    """
+    Two frame slots in shared memory. Every slot keeps codes of symbols
+    and attributes of all cells, row by row.
+    """
+
+    def __init__(self, name: Optional[str] = None, max_rows=MAX_ROWS,
+                 max_columns=MAX_COLUMNS):
+        self.capacity = max_rows * max_columns
+        size = (HEADER_SIZE + 4 * self.capacity) * array('I').itemsize
+        self._memory = shared_memory.SharedMemory(name, create=name is None,
+                                                  size=size)
+        self.name = self._memory.name
+        self._cells = self._memory.buf.cast('I')
+
+    def close(self, unlink=False):
+        self._cells.release()
+        self._memory.close()
+        if unlink:
+            self._memory.unlink()
+
+    def _get_offsets(self, slot) -> Tuple[int, int]:
+        symbols_offset = HEADER_SIZE + 2 * slot * self.capacity
+        return symbols_offset, symbols_offset + self.capacity
+
+    def _get_bytes(self, offset, size) -> memoryview:
+        itemsize = self._cells.itemsize
+        return self._memory.buf[offset * itemsize:(offset + size) * itemsize]
+
+    @property
+    def frame_number(self) -> int:
+        return self._cells[FRAME_NUMBER]
+
+    def publish(self, rows, columns, symbols: array, attrs: array):
+        """Write frame to the slot not shown by renderer and publish it."""
+
+        cells = self._cells
+        slot = 1 - cells[PUBLISHED_SLOT]
+        symbols_offset, attrs_offset = self._get_offsets(slot)
+        size = rows * columns
+        cells[symbols_offset:symbols_offset + size] = symbols
+        cells[attrs_offset:attrs_offset + size] = attrs
+        cells[SLOT_SIZES + 2 * slot] = rows
+        cells[SLOT_SIZES + 2 * slot + 1] = columns
+
+        cells[PUBLISHED_SLOT] = slot
+        cells[FRAME_NUMBER] += 1
+
+    def read(self, symbols: array, attrs: array) -> Tuple[int, int, int]:
+        """
+        Copy the last published frame to arrays, return frame number and
+        size. Copy is repeated if worker has published next frame meanwhile,
+        as it could start to overwrite the slot.
+        """
+
+        cells = self._cells
+        while True:
+            frame_number = cells[FRAME_NUMBER]
+            slot = cells[PUBLISHED_SLOT]
+            rows = cells[SLOT_SIZES + 2 * slot]
+            columns = cells[SLOT_SIZES + 2 * slot + 1]
+            symbols_offset, attrs_offset = self._get_offsets(slot)
+            size = rows * columns
+
+            del symbols[:], attrs[:]
+            symbols.frombytes(self._get_bytes(symbols_offset, size))
+            attrs.frombytes(self._get_bytes(attrs_offset, size))
+            if cells[FRAME_NUMBER] == frame_number:
+                return frame_number, rows, columns
+
+
+class SharedFrameCanvas:
+    """
+    Curses window stand-in for the worker. Keeps screen content in arrays,
+    publishes it to shared frames on every refresh.
+    """
+
+    def __init__(self, frames: SharedFrames, rows: int, columns: int):
+        self.frames = frames
+        self.resize(rows, columns)
+
+    def getmaxyx(self):
+        return self._rows, self._columns
+
+    def resize(self, rows, columns):
+        self._rows, self._columns = rows, columns
+        self._symbols = array('I', [ord(' ')]) * (rows * columns)
+        self._attrs = array('I', [0]) * (rows * columns)
+
+    def nodelay(self, flag):
+        pass
+
+    def addstr(self, row, column, text, attr=0):
+        start = row * self._columns + column
+        end = start + len(text)
+        self._symbols[start:end] = array('I', map(ord, text))
+        self._attrs[start:end] = array('I', [attr]) * len(text)
+
+    def refresh(self):
+        self.frames.publish(self._rows, self._columns, self._symbols,
+                            self._attrs)
+
+
+class QueueControls:
+    """
+    Controls reader of the worker. Takes all messages sent by renderer
+    since the previous tick: controls state, pause and terminal resize.
+    """
+
+    def __init__(self, messages: multiprocessing.Queue):
+        self.messages = messages
+
+    def __call__(self, canvas, on_resize=None,
+                 on_pause=None) -> Tuple[int, int, bool]:
+        rows_direction = columns_direction = 0
+        space_pressed = False
+
+        while True:
+            try:
+                message = self.messages.get_nowait()
+            except queue.Empty:
+                break
+
+            if message[0] == 'resize':
+                _, rows, columns = message
+                canvas.resize(rows, columns)
+                if on_resize is not None:
+                    on_resize()
+                continue
+            if message[0] == 'pause':
+                if on_pause is not None:
+                    on_pause()
+                continue
+
+            _, rows_move, columns_move, is_shot = message
+            rows_direction = rows_move or rows_direction
+            columns_direction = columns_move or columns_direction
+            space_pressed = space_pressed or is_shot
+
+        return rows_direction, columns_direction, space_pressed
+
+
+def run_worker(frames_name: str, rows: int, columns: int,
+               messages: multiprocessing.Queue, timeline_file: str):
+    frames = SharedFrames(frames_name)
+    canvas = SharedFrameCanvas(frames, rows, columns)
+
+    game = MyGame()
+    game.timeline = Timeline.load(timeline_file)
+    game.controls_reader = QueueControls(messages)
+    game.setup(canvas)
+    try:
+        game.clock.run(lambda render: game.tick(canvas, render))
+    finally:
+        frames.close()
+
+
+class SplitRenderer:
+    """
+    Renderer of the game simulated by the worker process. Polls controls,
+    sends them to worker and pushes changed cells of new frames to screen.
+    """
+
+    def __init__(self, controls_reader=read_controls,
+                 timeline_file=TIMELINE_FILE):
+        self.controls_reader = controls_reader
+        self.timeline_file = timeline_file
+        self.frames_count = 0
+        # functions called after every frame is shown on the screen
+        self.render_listeners = []
+
+        self._screen = None
+        self._buffer: Optional[FrameBuffer] = None
+        self._messages: Optional[multiprocessing.Queue] = None
+        self._frame_number = 0
+        self._symbols = array('I')
+        self._attrs = array('I')
+        self._shown_symbols = array('I')
+        self._shown_attrs = array('I')
+
+    def _get_size(self) -> Tuple[int, int]:
+        rows, columns = self._screen.getmaxyx()
+        return min(rows, MAX_ROWS), min(columns, MAX_COLUMNS)
+
+    def resize(self):
+        rows, columns = self._get_size()
+        self._buffer.resize(rows, columns)
+        self._shown_symbols = array('I')
+        self._shown_attrs = array('I')
+        self._messages.put(('resize', rows, columns))
+
+    def pause(self):
+        self._messages.put(('pause',))
+
+    def _draw(self, rows, columns):
+        """Put rows changed since the previous frame to the buffer."""
+
+        buffer = self._buffer
+        symbols, attrs = self._symbols, self._attrs
+        shown_symbols, shown_attrs = self._shown_symbols, self._shown_attrs
+        is_first_frame = len(shown_symbols) != len(symbols)
+
+        for row in range(rows):
+            start = row * columns
+            end = start + columns
+            if (not is_first_frame and
+                    symbols[start:end] == shown_symbols[start:end] and
+                    attrs[start:end] == shown_attrs[start:end]):
+                continue
+            for column in range(columns):
+                index = start + column
+                buffer.put(row, column, chr(symbols[index]), attrs[index])
+
+        self._shown_symbols = array('I', symbols)
+        self._shown_attrs = array('I', attrs)
+
+    def run(self, screen):
+        curses.curs_set(False)
+        screen.nodelay(True)
+        self._screen = screen
+
+        rows, columns = self._get_size()
+        self._buffer = FrameBuffer(rows, columns)
+        self._messages = multiprocessing.Queue()
+        frames = SharedFrames()
+        worker = multiprocessing.Process(
+            target=run_worker,
+            args=(frames.name, rows, columns, self._messages,
+                  self.timeline_file),
+            daemon=True)
+        worker.start()
+
+        try:
+            while worker.is_alive():
+                controls = self.controls_reader(screen, self.resize,
+                                                self.pause)
+                if any(controls):
+                    self._messages.put(('controls', *controls))
+
+                if frames.frame_number != self._frame_number:
+                    self._frame_number, rows, columns = frames.read(
+                        self._symbols, self._attrs)
+                    # frame drawn before worker has got the resize
+                    if (rows, columns) == self._buffer.getmaxyx():
+                        self._draw(rows, columns)
+                        self._buffer.flush(screen)
+                        screen.refresh()
+                        self.frames_count += 1
+                        for listener in self.render_listeners:
+                            listener()
+
+                time.sleep(RENDER_INTERVAL)
+        finally:
+            worker.terminate()
+            worker.join()
+            frames.close(unlink=True)
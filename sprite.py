@@ -0,0 +1,100 @@
+from typing import List, NamedTuple, Tuple
+
+
+class Run(NamedTuple):
+    row: int
+    column: int
+    text: str
+    blank: str
+
+
+class Sprite:
+    """
+    Multiline text frame compiled once to runs of non-space symbols.
+    Spaces are transparent, so each run is drawn with a single addstr call.
+    Mask keeps occupied cells of every row as bits of integer,
+    lowest bit is the first column.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.runs: List[Run] = []
+        self.mask: Tuple[int, ...] = ()
+
+        lines = text.splitlines()
+        self.rows = len(lines)
+        self.columns = max((len(line) for line in lines), default=0)
+
+        mask = []
+        for row, line in enumerate(lines):
+            row_mask = 0
+            column = 0
+            for chunk in line.split(' '):
+                if chunk:
+                    self.runs.append(Run(row, column, chunk, ' ' * len(chunk)))
+                    row_mask |= ((1 << len(chunk)) - 1) << column
+                column += len(chunk) + 1
+            mask.append(row_mask)
+        self.mask = tuple(mask)
+
+    def to_data(self) -> dict:
+        """Return compiled sprite as plain data, e.g. to store it in JSON."""
+
+        return {
+            'text': self.text,
+            'rows': self.rows,
+            'columns': self.columns,
+            'runs': [[row, column, text]
+                     for row, column, text, _ in self.runs],
+            'mask': list(self.mask),
+        }
+
+    @classmethod
+    def from_data(cls, data: dict) -> 'Sprite':
+        """Restore sprite from to_data result without compiling it again."""
+
+        sprite = cls.__new__(cls)
+        sprite.text = str(data['text'])
+        sprite.rows = int(data['rows'])
+        sprite.columns = int(data['columns'])
+        sprite.runs = [Run(int(row), int(column), str(text), ' ' * len(text))
+                       for row, column, text in data['runs']]
+        sprite.mask = tuple(int(row_mask) for row_mask in data['mask'])
+        return sprite
+
+    def __str__(self):
+        return self.text
+
+    @property
+    def size(self):
+        return self.rows, self.columns
+
+    def draw(self, canvas, start_row, start_column, negative=False):
+        """Draw sprite clipped by canvas, erase it if negative=True."""
+
+        rows_number, columns_number = canvas.getmaxyx()
+        start_row, start_column = round(start_row), round(start_column)
+
+        for run_row, run_column, text, blank in self.runs:
+            row = start_row + run_row
+            if row < 0:
+                continue
+            if row >= rows_number:
+                break
+
+            column = start_column + run_column
+            if negative:
+                text = blank
+
+            if column < 0:
+                text = text[-column:]
+                column = 0
+
+            # Curses will raise exception after writing to a lower right
+            # corner of the window, so it is always left untouched
+            max_length = columns_number - column
+            if row == rows_number - 1:
+                max_length -= 1
+            if max_length <= 0 or not text:
+                continue
+            canvas.addstr(row, column, text[:max_length])
@@ -0,0 +1,92 @@
+import curses
+from array import array
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from scheduler import sleep
+
+
+# Tick of blink cycle, when star changes its brightness, and new attributes
+BLINK_PHASES = (
+    (0, curses.A_DIM),
+    (20, curses.A_NORMAL),
+    (23, curses.A_BOLD),
+    (28, curses.A_NORMAL),
+)
+BLINK_PERIOD = 31
+
+
+class StarField:
+    """
+    All blinking stars of the sky kept in flat arrays. Stars are grouped by
+    their start delay modulo blink period, so on every tick only the stars
+    changing brightness are looked up and redrawn.
+    """
+
+    def __init__(self, stars: Dict[tuple, list]):
+        """stars — dict {(x, y): [symbol, start_delay]}."""
+
+        self._build(stars.items())
+
+    def _build(self, stars: Iterable[Tuple[tuple, list]]):
+        self.rows = array('H')
+        self.columns = array('H')
+        self.delays = array('H')
+        symbols = []
+
+        self._phase_groups: List[array] = [
+            array('I') for _ in range(BLINK_PERIOD)
+        ]
+
+        for index, ((x, y), (symbol, delay)) in enumerate(stars):
+            self.rows.append(y)
+            self.columns.append(x)
+            self.delays.append(delay)
+            symbols.append(symbol)
+            self._phase_groups[delay % BLINK_PERIOD].append(index)
+
+        self.symbols = ''.join(symbols)
+
+    def items(self) -> Iterator[Tuple[tuple, list]]:
+        """Iterate stars same way as dict passed to constructor."""
+
+        for x, y, symbol, delay in zip(self.columns, self.rows, self.symbols,
+                                       self.delays):
+            yield (x, y), [symbol, delay]
+
+    def resize(self, max_row: int, max_column: int,
+               new_stars: Dict[tuple, list]):
+        """
+        Remove stars placed after max_row or max_column and add new ones,
+        e.g. for the area appeared after terminal resize.
+        """
+
+        stars = {
+            coords: attributes for coords, attributes in self.items()
+            if coords[0] <= max_column and coords[1] <= max_row
+        }
+        stars.update(new_stars)
+        self._build(stars.items())
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def draw(self, canvas, tick: int):
+        """Redraw stars changing brightness at the tick."""
+
+        rows, columns, delays = self.rows, self.columns, self.delays
+        symbols = self.symbols
+
+        for phase_tick, attr in BLINK_PHASES:
+            cycle_tick = tick - phase_tick
+            for index in self._phase_groups[cycle_tick % BLINK_PERIOD]:
+                if delays[index] > cycle_tick:
+                    continue
+                canvas.addstr(rows[index], columns[index], symbols[index],
+                              attr)
+
+    async def animate(self, canvas):
+        tick = 0
+        while True:
+            self.draw(canvas, tick)
+            tick += 1
+            await sleep(1)
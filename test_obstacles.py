@@ -0,0 +1,53 @@
+import random
+
+from obstacles import has_mask_collision, has_swept_collision
+
+
+DENSE_SAMPLES = 1000
+
+
+def make_mask(rng, rows, columns):
+    return tuple(rng.randrange(1, 1 << columns) for _ in range(rows))
+
+
+def has_sampled_collision(obstacle_row, obstacle_column, obstacle_mask,
+                          obstacle_row_move, obstacle_column_move,
+                          obj_row, obj_column, obj_mask,
+                          obj_row_move, obj_column_move):
+    for step in range(DENSE_SAMPLES + 1):
+        time = step / DENSE_SAMPLES
+        if has_mask_collision(
+                obstacle_row + obstacle_row_move * time,
+                obstacle_column + obstacle_column_move * time,
+                obstacle_mask,
+                obj_row + obj_row_move * time,
+                obj_column + obj_column_move * time,
+                obj_mask):
+            return True
+    return False
+
+
+def test_swept_collision_between_rounding_changes():
+    # both round to row 3 only for t in (0.39, 0.51)
+    assert has_swept_collision(2.307, 3, (1,), 0.495, 0,
+                               2.652, 3, (1,), -0.3, 0)
+
+
+def test_swept_collision_matches_dense_sampling():
+    rng = random.Random(13)
+    collisions = 0
+    for _ in range(2000):
+        obstacle_mask = make_mask(rng, rng.randint(1, 4), rng.randint(1, 6))
+        obj_mask = make_mask(rng, rng.randint(1, 2), rng.randint(1, 3))
+        args = (
+            rng.uniform(0, 6), rng.uniform(0, 6), obstacle_mask,
+            rng.uniform(-1.5, 1.5), rng.choice((0, rng.uniform(-1.5, 1.5))),
+            rng.uniform(0, 6), rng.uniform(0, 6), obj_mask,
+            rng.uniform(-2, 2), rng.choice((0, rng.uniform(-2, 2))),
+        )
+        is_sampled = has_sampled_collision(*args)
+        collisions += is_sampled
+        # sampling misses overlaps shorter than its step, swept check not
+        if is_sampled:
+            assert has_swept_collision(*args), args
+    assert collisions > 200
@@ -0,0 +1,63 @@
+import random
+from array import array
+
+from physics import SpeedTable, update_speed, update_speeds
+
+
+def make_walk(rng, ticks):
+    return [(rng.choice((-1, 0, 1)), rng.choice((-1, 0, 1)))
+            for _ in range(ticks)]
+
+
+def test_speed_table_matches_update_speed():
+    rng = random.Random(23)
+    table = SpeedTable()
+    for _ in range(50):
+        row_speed = column_speed = 0
+        table_row_speed = table_column_speed = 0
+        for rows_direction, columns_direction in make_walk(rng, 300):
+            row_speed, column_speed = update_speed(
+                row_speed, column_speed, rows_direction, columns_direction)
+            table_row_speed = table.update(table_row_speed, rows_direction)
+            table_column_speed = table.update(table_column_speed,
+                                              columns_direction)
+            assert (table_row_speed, table_column_speed) == (
+                row_speed, column_speed)
+
+
+def test_speed_table_evicts_old_speeds():
+    rng = random.Random(23)
+    table = SpeedTable(precomputed_ticks=0, max_cached_speeds=64)
+    for _ in range(20):
+        speed = expected = 0
+        for direction, _ in make_walk(rng, 300):
+            speed = table.update(speed, direction)
+            expected, _ = update_speed(expected, 0, direction, 0)
+            assert speed == expected
+    assert len(table) == 64
+
+    # speeds of the current walk are cached again after eviction
+    misses = table._get_accelerated.cache_info().misses
+    for _ in range(5):
+        speed = 0
+        for _ in range(10):
+            speed = table.update(speed, 1)
+    assert table._get_accelerated.cache_info().misses - misses <= 10
+
+
+def test_update_speeds_matches_update_speed():
+    rng = random.Random(23)
+    bodies_count = 100
+    row_speeds = array('d', [0]) * bodies_count
+    column_speeds = array('d', [0]) * bodies_count
+    expected = [(0, 0)] * bodies_count
+    for _ in range(100):
+        walk = make_walk(rng, bodies_count)
+        rows_directions = [rows_direction for rows_direction, _ in walk]
+        columns_directions = [columns_direction
+                              for _, columns_direction in walk]
+        update_speeds(row_speeds, column_speeds, rows_directions,
+                      columns_directions)
+        expected = [update_speed(*speeds, *directions)
+                    for speeds, directions in zip(expected, walk)]
+        assert list(zip(row_speeds, column_speeds)) == expected
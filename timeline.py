@@ -0,0 +1,102 @@
+import json
+from typing import List, NamedTuple
+
+from fire_animation import FIRE_INTERVAL_TICKS
+from sprite import Sprite
+
+
+TIMELINE_FILE = 'timeline.json'
+
+
+class Year(NamedTuple):
+    year: int
+    # ticks between garbage launches, negative if no garbage is launched
+    garbage_delay: int
+    is_weapon_unlocked: bool
+    phrase: str
+    label: Sprite
+
+
+class Timeline:
+    """
+    Game years with garbage launch delay, weapon availability and label of
+    every year precomputed from config (see timeline.json). Eras in config
+    set parameters changed since their year, others are kept from the
+    previous era. Years after the last era keep its parameters. Optional
+    fire_interval_ticks sets the minimal ticks between shots.
+
+    Timeline is a cursor: current year is switched every ticks_per_year
+    ticks, nothing is computed on other ticks.
+    """
+
+    def __init__(self, config: dict):
+        try:
+            self.start_year = int(config['start_year'])
+            self.ticks_per_year = int(config['ticks_per_year'])
+            self.fire_interval = int(config.get('fire_interval_ticks',
+                                                FIRE_INTERVAL_TICKS))
+            eras = sorted(config['eras'], key=lambda era: era['year'])
+            self._phrases = {int(year): phrase
+                             for year, phrase in config['phrases'].items()}
+            if not eras or eras[0]['year'] > self.start_year:
+                raise ValueError('The first era should start before game.')
+            if self.ticks_per_year < 1:
+                raise ValueError('Year should last at least one tick.')
+            if self.fire_interval < 1:
+                raise ValueError('Shots should be at least one tick apart.')
+        except (KeyError, TypeError) as error:
+            raise ValueError(f'Wrong timeline config: {error!r}') from error
+
+        self._years: List[Year] = []
+        garbage_delay, is_weapon_unlocked = -1, False
+        last_year = max([self.start_year, eras[-1]['year'], *self._phrases])
+        eras_iterator = iter(eras)
+        next_era = next(eras_iterator)
+        for year in range(self.start_year, last_year + 1):
+            while next_era is not None and next_era['year'] <= year:
+                garbage_delay = int(next_era.get('garbage_delay',
+                                                 garbage_delay))
+                is_weapon_unlocked = bool(next_era.get('weapon_unlocked',
+                                                       is_weapon_unlocked))
+                next_era = next(eras_iterator, None)
+            self._years.append(self._make_year(year, garbage_delay,
+                                               is_weapon_unlocked))
+
+        self._index = 0
+        # the start year is switched already after the first tick
+        self._year_tick = 0
+
+    @classmethod
+    def load(cls, path=TIMELINE_FILE) -> 'Timeline':
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+
+    def _make_year(self, year, garbage_delay, is_weapon_unlocked) -> Year:
+        phrase = self._phrases.get(year, '')
+        label = Sprite(f'Year: {year} {phrase}')
+        return Year(year, garbage_delay, is_weapon_unlocked, phrase, label)
+
+    @property
+    def current(self) -> Year:
+        return self._years[self._index]
+
+    def seek(self, year: int):
+        """Make the year current, e.g. to start game from it."""
+
+        while year - self.start_year >= len(self._years):
+            self._extend()
+        self._index = max(year - self.start_year, 0)
+
+    def _extend(self):
+        last = self._years[-1]
+        self._years.append(self._make_year(last.year + 1, last.garbage_delay,
+                                           last.is_weapon_unlocked))
+
+    def end_tick(self):
+        """Count tick, switch to the next year if it is passed."""
+
+        if not self._year_tick:
+            if self._index + 1 == len(self._years):
+                self._extend()
+            self._index += 1
+        self._year_tick = (self._year_tick + 1) % self.ticks_per_year
@@ -0,0 +1,37 @@
+from typing import Tuple
+
+
+class Viewport:
+    """
+    Size of the game window. Cached to not ask curses for it every tick,
+    updated only when terminal is resized.
+    """
+
+    def __init__(self, rows=0, columns=0):
+        self.rows = rows
+        self.columns = columns
+
+    def __repr__(self):
+        return f'Viewport(rows={self.rows}, columns={self.columns})'
+
+    @property
+    def max_row(self) -> int:
+        return self.rows - 1
+
+    @property
+    def max_column(self) -> int:
+        return self.columns - 1
+
+    @property
+    def center(self) -> Tuple[int, int]:
+        """Return row and column of the window center."""
+
+        return self.max_row // 2, self.max_column // 2
+
+    def resize(self, rows, columns) -> bool:
+        """Update size, return True if it is changed."""
+
+        if (rows, columns) == (self.rows, self.columns):
+            return False
+        self.rows, self.columns = rows, columns
+        return True